@@ -0,0 +1,279 @@
+"""基于 NumPy/Numba 的技术指标实现，替代 ta 库
+
+函数名称和默认参数与 ta 库保持一致，但输入输出均为 float64 ndarray，
+长度与输入相同，不足一个窗口的位置为 NaN（ATR 与 ta 一致为 0）。
+"""
+import functools
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def lazy_njit(func):
+    """首次调用时才导入 numba 并编译（带磁盘缓存）；未安装 numba 时直接运行 Python 版本
+
+    numba 导入本身就需要数百毫秒，延迟到第一次计算指标时再加载，
+    不影响服务启动和只读接口。
+    """
+    compiled = None
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        nonlocal compiled
+        if compiled is None:
+            try:
+                from numba import njit
+                compiled = njit(cache=True)(func)
+            except ImportError:
+                compiled = func
+        return compiled(*args)
+
+    return wrapper
+
+
+@lazy_njit
+def _ewm(x, alpha, min_periods):
+    """递推指数加权平均，等价于 pandas ewm(alpha=alpha, adjust=False).mean()
+
+    与 pandas 一致：NaN 不更新均值、该位置沿用上一个值，但旧值的权重照常衰减；
+    min_periods 按有效观测数计算。
+    """
+    n = len(x)
+    out = np.full(n, np.nan)
+    weighted = np.nan
+    old_wt = 1.0
+    nobs = 0
+    for i in range(n):
+        cur = x[i]
+        observed = not np.isnan(cur)
+        if observed:
+            nobs += 1
+        if np.isnan(weighted):
+            if observed:
+                weighted = cur
+        else:
+            old_wt *= 1.0 - alpha
+            if observed:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        if nobs >= min_periods:
+            out[i] = weighted
+    return out
+
+
+@lazy_njit
+def _wilder_atr(true_range, n):
+    """Wilder 平滑的 ATR，前 n-1 个值为 0"""
+    out = np.zeros(len(true_range))
+    if len(true_range) < n:
+        return out
+    out[n - 1] = true_range[:n].mean()
+    for i in range(n, len(true_range)):
+        out[i] = (out[i - 1] * (n - 1) + true_range[i]) / n
+    return out
+
+
+@lazy_njit
+def _wilder_adx(high, low, true_range, n):
+    """Wilder ADX：平滑 +DM/-DM/TR 得到 DX，再对 DX 做 Wilder 平滑"""
+    size = len(high)
+    out = np.full(size, np.nan)
+    if size < 2 * n:
+        return out
+
+    dx = np.zeros(size)
+    tr_s = 0.0
+    pos_s = 0.0
+    neg_s = 0.0
+    for i in range(1, size):
+        up = high[i] - high[i - 1]
+        down = low[i - 1] - low[i]
+        pos = up if (up > down and up > 0) else 0.0
+        neg = down if (down > up and down > 0) else 0.0
+        if i <= n:
+            tr_s += true_range[i]
+            pos_s += pos
+            neg_s += neg
+        else:
+            tr_s = tr_s - tr_s / n + true_range[i]
+            pos_s = pos_s - pos_s / n + pos
+            neg_s = neg_s - neg_s / n + neg
+        if i >= n and tr_s != 0:
+            di_pos = 100.0 * pos_s / tr_s
+            di_neg = 100.0 * neg_s / tr_s
+            if di_pos + di_neg != 0:
+                dx[i] = 100.0 * abs(di_pos - di_neg) / (di_pos + di_neg)
+
+    out[2 * n - 1] = dx[n:2 * n].mean()
+    for i in range(2 * n, size):
+        out[i] = (out[i - 1] * (n - 1) + dx[i]) / n
+    return out
+
+
+def _rolling(x: np.ndarray, window: int, reducer) -> np.ndarray:
+    """尾随滚动窗口聚合，前 window-1 个值为 NaN"""
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = reducer(sliding_window_view(x, window), axis=1)
+    return out
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """真实波幅，第一根K线为 high - low"""
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+# 趋势指标
+
+def sma_indicator(close: np.ndarray, window: int = 12) -> np.ndarray:
+    """简单移动平均（累加和差分）；与 pandas rolling 一致，窗口内有 NaN 时结果为 NaN"""
+    out = np.full(len(close), np.nan)
+    if len(close) >= window:
+        missing = np.isnan(close)
+        c = np.cumsum(np.concatenate(([0.0], np.where(missing, 0.0, close))))
+        gaps = np.cumsum(np.concatenate(([0], missing)))
+        means = (c[window:] - c[:-window]) / window
+        out[window - 1:] = np.where(gaps[window:] == gaps[:-window], means, np.nan)
+    return out
+
+
+def ema_indicator(close: np.ndarray, window: int = 12) -> np.ndarray:
+    """指数移动平均，span=window"""
+    return _ewm(close, 2.0 / (window + 1), window)
+
+
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """平均趋向指数"""
+    return _wilder_adx(high, low, _true_range(high, low, close), window)
+
+
+def cci(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+        window: int = 20, constant: float = 0.015) -> np.ndarray:
+    """商品通道指数"""
+    typical_price = (high + low + close) / 3.0
+    out = np.full(len(close), np.nan)
+    if len(close) >= window:
+        windows = sliding_window_view(typical_price, window)
+        mean = windows.mean(axis=1)
+        mad = np.abs(windows - mean[:, None]).mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[window - 1:] = (typical_price[window - 1:] - mean) / (constant * mad)
+    return out
+
+
+# 动量指标
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Wilder 平滑的 RSI"""
+    diff = np.diff(close, prepend=close[:1])
+    gain = _ewm(np.where(diff > 0, diff, 0.0), 1.0 / window, window)
+    loss = _ewm(np.where(diff < 0, -diff, 0.0), 1.0 / window, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100.0 - 100.0 / (1.0 + gain / loss)
+    return np.where(loss == 0, 100.0, out)
+
+
+def stoch(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+          window: int = 14, smooth_window: int = 3) -> np.ndarray:
+    """随机指标 %K"""
+    lowest = _rolling(low, window, np.min)
+    highest = _rolling(high, window, np.max)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100.0 * (close - lowest) / (highest - lowest)
+
+
+def stoch_signal(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                 window: int = 14, smooth_window: int = 3) -> np.ndarray:
+    """随机指标 %D（%K 的简单移动平均）"""
+    # %K 开头有 NaN，不能用累加和实现的 sma_indicator
+    return _rolling(stoch(high, low, close, window, smooth_window), smooth_window, np.mean)
+
+
+def williams_r(high: np.ndarray, low: np.ndarray, close: np.ndarray, lbp: int = 14) -> np.ndarray:
+    """威廉指标 %R"""
+    highest = _rolling(high, lbp, np.max)
+    lowest = _rolling(low, lbp, np.min)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return -100.0 * (highest - close) / (highest - lowest)
+
+
+# 波动性指标
+
+def average_true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """平均真实波幅"""
+    return _wilder_atr(_true_range(high, low, close), window)
+
+
+# 成交量指标
+
+def volume_sma(volume: np.ndarray, window: int = 20) -> np.ndarray:
+    """成交量简单移动平均"""
+    return sma_indicator(volume, window)
+
+
+def on_balance_volume(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """能量潮 OBV"""
+    falling = np.concatenate(([False], close[1:] < close[:-1]))
+    return np.cumsum(np.where(falling, -volume, volume))
+
+
+def volume_price_trend(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """量价趋势 VPT，第一个值为 NaN"""
+    out = np.full(len(close), np.nan)
+    if len(close) > 1:
+        out[1:] = np.cumsum(np.diff(close) / close[:-1] * volume[1:])
+    return out
+
+
+def money_flow_index(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                     volume: np.ndarray, window: int = 14) -> np.ndarray:
+    """资金流量指数 MFI"""
+    typical_price = (high + low + close) / 3.0
+    direction = np.sign(np.diff(typical_price, prepend=typical_price[:1]))
+    money_flow = typical_price * volume * direction
+    positive = _rolling(np.where(money_flow >= 0, money_flow, 0.0), window, np.sum)
+    negative = _rolling(np.where(money_flow < 0, -money_flow, 0.0), window, np.sum)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100.0 - 100.0 / (1.0 + positive / negative)
+
+
+def _check_against_pandas(size: int = 400, seed: int = 0) -> float:
+    """与 pandas/ta 的参考实现比对（含中间 NaN 的序列），返回最大绝对误差
+
+    用法: python -m analysis._ta_compat
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, size))
+    close[rng.choice(np.arange(30, size), 5, replace=False)] = np.nan
+    series = pd.Series(close)
+
+    def compare(name, actual, expected):
+        if not np.array_equal(np.isnan(actual), np.isnan(expected)):
+            raise AssertionError(f"{name} 的 NaN 位置与 pandas 不一致")
+        errors.append(np.nanmax(np.abs(actual - expected)))
+
+    errors = []
+    for window in (9, 12, 26):
+        compare(f"EMA({window})", ema_indicator(close, window),
+                series.ewm(span=window, min_periods=window, adjust=False).mean().to_numpy())
+    for window in (20, 50):
+        compare(f"SMA({window})", sma_indicator(close, window),
+                series.rolling(window, min_periods=window).mean().to_numpy())
+
+    diff = series.diff()
+    gain = diff.where(diff > 0, 0.0).ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    loss = -diff.where(diff < 0, 0.0).ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    expected_rsi = (100 - 100 / (1 + gain / loss)).where(loss != 0, 100).to_numpy()
+    compare("RSI(14)", rsi(close, 14), expected_rsi)
+
+    return float(max(errors))
+
+
+if __name__ == '__main__':
+    error = _check_against_pandas()
+    print(f"与 pandas 参考实现的最大误差: {error:.3e}")
+    if error > 1e-9:
+        raise SystemExit(1)
@@ -1,16 +1,67 @@
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+import asyncio
+import bisect
+import re
+import numpy as np
 import pandas as pd
 from .technical_indicators import TechnicalAnalyzer
+from .llm_client import (
+    cache_response, get_async_chat_model, get_cached_response, get_chat_model,
+    invoke_cached, prompt_key, response_text,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 固定为0使相同输入得到相同输出，便于缓存LLM响应
+_LLM_TEMPERATURE = 0.0
+
+# 批量分析响应中每只股票的标题，如 "## 2. MSFT 分析"；必须带股票代码，
+# 以免把 "## 1. 技术面分析" 这类小标题当成股票标题
+_BATCH_HEADER_PATTERN = r'^##\s*(\d+)\.\s*({symbols})(?![\w.^=-])'
+
+# 市值分档：不超过十亿按百万、不超过万亿按十亿、其余按万亿显示
+_MARKET_CAP_BREAKS = (1e9, 1e12)
+_MARKET_CAP_UNITS = ((1e6, '百万'), (1e9, '十亿'), (1e12, '万亿'))
+
+# 基本面比率字段：(字段, 输出模板, 缩放系数)，仅在值大于0时输出
+_FUNDAMENTAL_FIELDS = (
+    ('pe_ratio', '市盈率: {:.2f}', 1),
+    ('dividend_yield', '股息率: {:.2f}%', 100),
+    ('beta', 'Beta系数: {:.2f}', 1),
+)
+
+# 提示词中的静态部分，导入时拼接一次
+_ANALYSIS_TASKS = """1. **技术面分析**: 结合各项技术指标，判断当前的技术形态和趋势方向
+2. **风险评估**: 分析当前的投资风险，包括技术风险和市场风险
+3. **投资建议**: 给出具体的投资建议和操作策略
+4. **关键价位**: 指出重要的支撑位和阻力位
+5. **风险提示**: 提醒投资者需要注意的风险点"""
+
+_ANALYSIS_REQUIREMENTS = """- 使用专业但易懂的语言
+- 结构清晰，分点论述
+- 不要给出具体的买入/卖出价格建议
+- 强调风险管理的重要性
+- 使用中文回答"""
+
+_ANALYSIS_PROMPT_TAIL = (
+    "\n\n请基于以上信息，从以下几个维度进行分析：\n\n" + _ANALYSIS_TASKS
+    + "\n\n要求：\n" + _ANALYSIS_REQUIREMENTS
+)
+
+_BATCH_PROMPT_TAIL = (
+    "\n\n请基于以上信息，对每只股票从以下几个维度进行分析：\n\n" + _ANALYSIS_TASKS
+    + "\n\n要求：\n- 为每只股票分别输出，每只股票以 \"## N. <股票代码> 分析\" 作为标题（N 为上面的编号），按编号顺序输出\n"
+    + _ANALYSIS_REQUIREMENTS
+)
+
 
 class EnhancedLLMReasoner:
     """增强的LLM分析器，结合技术指标和基本面分析"""
     
-    def __init__(self):
-        self.technical_analyzer = TechnicalAnalyzer()
+    def __init__(self, technical_analyzer: Optional[TechnicalAnalyzer] = None):
+        # 允许与调用方共享同一个分析器，以复用其指标缓存
+        self.technical_analyzer = technical_analyzer or TechnicalAnalyzer()
     
     def comprehensive_analysis(self, symbol: str, df: pd.DataFrame, stock_info: Dict = None, 
                              model_name: str = "qwen2.5") -> str:
@@ -20,52 +71,126 @@ class EnhancedLLMReasoner:
             return "没有足够的数据进行分析。"
         
         try:
-            # 1. 基础价格分析
-            price_summary = self._analyze_price_action(df)
-            
-            # 2. 技术指标分析
-            technical_indicators = self.technical_analyzer.calculate_all_indicators(df)
-            technical_summary = self.technical_analyzer.format_indicators_summary(technical_indicators)
-            trading_signals = self.technical_analyzer.get_trading_signals(technical_indicators)
-            
-            # 3. 基本面信息
-            fundamental_summary = self._format_fundamental_info(stock_info) if stock_info else ""
+            analysis_prompt = self._prepare_analysis_prompt(symbol, df, stock_info)
             
-            # 4. 构建详细的分析提示词
-            analysis_prompt = self._build_analysis_prompt(
-                symbol, price_summary, technical_summary, 
-                trading_signals, fundamental_summary
-            )
+            # 调用LLM进行综合分析
+            return self._call_llm_analysis(analysis_prompt, model_name)
             
-            # 5. 调用LLM进行综合分析
-            llm_analysis = self._call_llm_analysis(analysis_prompt, model_name)
-            
-            return llm_analysis
+        except Exception as e:
+            logger.error(f"综合分析失败: {e}")
+            return f"分析过程中出现错误: {str(e)}"
+    
+    async def comprehensive_analysis_async(self, symbol: str, df: pd.DataFrame, stock_info: Dict = None,
+                                           model_name: str = "qwen2.5") -> str:
+        """comprehensive_analysis 的异步版本，LLM调用不阻塞事件循环"""
+        
+        if df is None or df.empty:
+            return "没有足够的数据进行分析。"
+        
+        try:
+            # 指标计算（冷启动时还有 Numba 编译）放到线程池，不阻塞事件循环
+            analysis_prompt = await asyncio.to_thread(self._prepare_analysis_prompt, symbol, df, stock_info)
+            return await self._call_llm_analysis_async(analysis_prompt, model_name)
             
         except Exception as e:
             logger.error(f"综合分析失败: {e}")
             return f"分析过程中出现错误: {str(e)}"
     
+    def comprehensive_analysis_stream(self, symbol: str, df: pd.DataFrame, stock_info: Dict = None,
+                                      model_name: str = "qwen2.5") -> Iterator[str]:
+        """流式综合分析，逐段产出LLM生成的文本"""
+        
+        if df is None or df.empty:
+            yield "没有足够的数据进行分析。"
+            return
+        
+        try:
+            analysis_prompt = self._prepare_analysis_prompt(symbol, df, stock_info)
+            key = prompt_key(model_name, analysis_prompt)
+            cached = get_cached_response(key)
+            if cached is not None:
+                yield cached
+                return
+            
+            llm = get_chat_model(model_name, temperature=_LLM_TEMPERATURE)
+            chunks = []
+            for chunk in llm.stream(analysis_prompt):
+                text = response_text(chunk)
+                chunks.append(text)
+                yield text
+            cache_response(key, "".join(chunks))
+            
+        except ImportError:
+            yield "LLM分析功能需要安装 langchain-ollama 依赖包。请运行: pip install langchain-ollama"
+        except Exception as e:
+            logger.error(f"流式分析失败: {e}")
+            yield f"AI分析暂时不可用: {str(e)}\n\n请确认 Ollama 服务正在运行，并已安装模型 {model_name}。"
+    
+    def batch_analysis(self, symbols_and_dfs: List[Tuple[str, pd.DataFrame, Optional[Dict]]],
+                       model_name: str = "qwen2.5") -> List[str]:
+        """在一次LLM调用中分析多只股票，items 为 (symbol, df, stock_info) 列表，结果按输入顺序返回"""
+        if not symbols_and_dfs:
+            return []
+        
+        try:
+            sections = []
+            for i, (symbol, df, stock_info) in enumerate(symbols_and_dfs, 1):
+                if df is None or df.empty:
+                    sections.append(f"## Stock {i}: {symbol}\n没有足够的数据。")
+                    continue
+                inputs = self._collect_analysis_inputs(df, stock_info)
+                sections.append(f"## Stock {i}: {symbol}\n" + self._format_stock_section(*inputs))
+            
+            prompt = self._build_batch_prompt(sections)
+            response = self._call_llm_analysis(prompt, model_name)
+            return self._split_batch_response(response, [symbol for symbol, _, _ in symbols_and_dfs])
+            
+        except Exception as e:
+            logger.error(f"批量分析失败: {e}")
+            return [f"分析过程中出现错误: {str(e)}"] * len(symbols_and_dfs)
+    
+    def _prepare_analysis_prompt(self, symbol: str, df: pd.DataFrame, stock_info: Dict = None) -> str:
+        """计算价格与技术指标摘要并构建分析提示词"""
+        return self._build_analysis_prompt(symbol, *self._collect_analysis_inputs(df, stock_info))
+    
+    def _collect_analysis_inputs(self, df: pd.DataFrame, stock_info: Dict = None) -> Tuple:
+        """计算构建提示词所需的价格、技术指标、交易信号和基本面摘要"""
+        # 1. 基础价格分析
+        price_summary = self._analyze_price_action(df)
+        
+        # 2. 技术指标分析
+        technical_indicators = self.technical_analyzer.calculate_all_indicators(df)
+        technical_summary = self.technical_analyzer.format_indicators_summary(technical_indicators)
+        trading_signals = self.technical_analyzer.get_trading_signals(technical_indicators)
+        
+        # 3. 基本面信息
+        fundamental_summary = self._format_fundamental_info(stock_info) if stock_info else ""
+        
+        return price_summary, technical_summary, trading_signals, fundamental_summary
+    
     def _analyze_price_action(self, df: pd.DataFrame, lookback_days: int = 30) -> Dict:
         """分析价格走势"""
         try:
             if len(df) < lookback_days:
                 lookback_days = len(df)
             
-            recent_data = df.tail(lookback_days)
+            tail = df.tail(lookback_days)
+            close = tail['Close'].to_numpy(dtype=np.float64)
             
-            start_price = float(recent_data['Close'].iloc[0])
-            end_price = float(recent_data['Close'].iloc[-1])
-            max_price = float(recent_data['High'].max())
-            min_price = float(recent_data['Low'].min())
-            avg_volume = float(recent_data['Volume'].mean())
+            start_price = float(close[0])
+            end_price = float(close[-1])
+            # 与 pandas 的归约一致，跳过缺失的K线
+            max_price = float(np.nanmax(tail['High'].to_numpy(dtype=np.float64)))
+            min_price = float(np.nanmin(tail['Low'].to_numpy(dtype=np.float64)))
+            avg_volume = float(np.nanmean(tail['Volume'].to_numpy(dtype=np.float64)))
             
             change = end_price - start_price
             change_pct = (change / start_price * 100) if start_price != 0 else 0.0
             
             # 计算波动率
-            returns = recent_data['Close'].pct_change().dropna()
-            volatility = returns.std() * 100 if len(returns) > 1 else 0
+            returns = np.diff(close) / close[:-1]
+            valid_returns = np.count_nonzero(~np.isnan(returns))
+            volatility = float(np.nanstd(returns, ddof=1) * 100) if valid_returns > 1 else 0
             
             # 趋势判断
             if change_pct > 5:
@@ -102,31 +227,20 @@ class EnhancedLLMReasoner:
             if not stock_info or 'error' in stock_info:
                 return ""
             
-            lines = []
-            lines.append(f"公司名称: {stock_info.get('name', 'N/A')}")
-            lines.append(f"行业: {stock_info.get('sector', 'N/A')} - {stock_info.get('industry', 'N/A')}")
+            lines = [
+                f"公司名称: {stock_info.get('name', 'N/A')}",
+                f"行业: {stock_info.get('sector', 'N/A')} - {stock_info.get('industry', 'N/A')}",
+            ]
             
-            market_cap = stock_info.get('market_cap', 0)
+            market_cap = stock_info.get('market_cap') or 0
             if market_cap > 0:
-                if market_cap > 1e12:
-                    cap_str = f"{market_cap/1e12:.2f}万亿"
-                elif market_cap > 1e9:
-                    cap_str = f"{market_cap/1e9:.2f}十亿"
-                else:
-                    cap_str = f"{market_cap/1e6:.2f}百万"
-                lines.append(f"市值: {cap_str} {stock_info.get('currency', 'USD')}")
-            
-            pe_ratio = stock_info.get('pe_ratio', 0)
-            if pe_ratio > 0:
-                lines.append(f"市盈率: {pe_ratio:.2f}")
-            
-            dividend_yield = stock_info.get('dividend_yield', 0)
-            if dividend_yield > 0:
-                lines.append(f"股息率: {dividend_yield*100:.2f}%")
-            
-            beta = stock_info.get('beta', 0)
-            if beta > 0:
-                lines.append(f"Beta系数: {beta:.2f}")
+                divisor, unit = _MARKET_CAP_UNITS[bisect.bisect_left(_MARKET_CAP_BREAKS, market_cap)]
+                lines.append(f"市值: {market_cap / divisor:.2f}{unit} {stock_info.get('currency', 'USD')}")
+            
+            for field, template, scale in _FUNDAMENTAL_FIELDS:
+                value = stock_info.get(field) or 0
+                if value > 0:
+                    lines.append(template.format(value * scale))
             
             return "\n".join(lines)
             
@@ -138,13 +252,21 @@ class EnhancedLLMReasoner:
                               technical_summary: str, trading_signals: Dict, 
                               fundamental_summary: str) -> str:
         """构建分析提示词"""
-        
-        prompt = f"""你是一位资深的证券分析师，请对股票 {symbol} 进行全面的投资分析。
-
-## 基本信息
+        return "".join((
+            f"你是一位资深的证券分析师，请对股票 {symbol} 进行全面的投资分析。\n\n",
+            self._format_stock_section(price_summary, technical_summary, trading_signals,
+                                       fundamental_summary, heading="##"),
+            _ANALYSIS_PROMPT_TAIL,
+        ))
+    
+    def _format_stock_section(self, price_summary: Dict, technical_summary: str,
+                              trading_signals: Dict, fundamental_summary: str,
+                              heading: str = "###") -> str:
+        """格式化单只股票的数据部分，heading 为各小节标题的前缀"""
+        return f"""{heading} 基本信息
 {fundamental_summary}
 
-## 价格走势分析（最近{price_summary.get('lookback_days', 30)}个交易日）
+{heading} 价格走势分析（最近{price_summary.get('lookback_days', 30)}个交易日）
 - 起始价格: ${price_summary.get('start_price', 0):.2f}
 - 最新价格: ${price_summary.get('end_price', 0):.2f}
 - 涨跌幅: {price_summary.get('change_pct', 0):.2f}%
@@ -154,43 +276,61 @@ class EnhancedLLMReasoner:
 - 趋势判断: {price_summary.get('trend', '未知')}
 - 平均成交量: {price_summary.get('avg_volume', 0):,.0f}
 
-## 技术指标分析
+{heading} 技术指标分析
 {technical_summary}
 
-## 交易信号
+{heading} 交易信号
 - 总体信号: {trading_signals.get('overall_signal', 'neutral')}
 - 信号强度: {trading_signals.get('signal_strength', 0):.2f}
-- 具体信号: {', '.join(trading_signals.get('signals', []))}
-
-请基于以上信息，从以下几个维度进行分析：
-
-1. **技术面分析**: 结合各项技术指标，判断当前的技术形态和趋势方向
-2. **风险评估**: 分析当前的投资风险，包括技术风险和市场风险
-3. **投资建议**: 给出具体的投资建议和操作策略
-4. **关键价位**: 指出重要的支撑位和阻力位
-5. **风险提示**: 提醒投资者需要注意的风险点
-
-要求：
-- 使用专业但易懂的语言
-- 结构清晰，分点论述
-- 不要给出具体的买入/卖出价格建议
-- 强调风险管理的重要性
-- 使用中文回答"""
-
-        return prompt
+- 具体信号: {', '.join(trading_signals.get('signals', []))}"""
+    
+    def _build_batch_prompt(self, sections: List[str]) -> str:
+        """构建多只股票的批量分析提示词，公共说明只出现一次"""
+        return "".join((
+            f"你是一位资深的证券分析师，请分别对以下 {len(sections)} 只股票进行全面的投资分析。\n\n",
+            "\n\n".join(sections),
+            _BATCH_PROMPT_TAIL,
+        ))
+    
+    @staticmethod
+    def _split_batch_response(response: str, symbols: List[str]) -> List[str]:
+        """按 "## N. <股票代码>" 标题拆分批量分析结果，编号与代码都需与输入一致"""
+        alternatives = '|'.join(re.escape(symbol) for symbol in sorted(set(symbols), key=len, reverse=True))
+        header_re = re.compile(_BATCH_HEADER_PATTERN.format(symbols=alternatives), re.MULTILINE | re.IGNORECASE)
+        headers = list(header_re.finditer(response))
+        if not headers:
+            # 没有任何标题（如LLM调用失败），每只股票返回完整响应
+            return [response] * len(symbols)
+        
+        results = {}
+        ends = [match.start() for match in headers[1:]] + [len(response)]
+        for match, end in zip(headers, ends):
+            number = int(match.group(1))
+            if 1 <= number <= len(symbols) and match.group(2).upper() == symbols[number - 1].upper():
+                results.setdefault(number, response[match.start():end].strip())
+        
+        return [results.get(i, "批量分析结果中缺少该股票的内容。") for i in range(1, len(symbols) + 1)]
     
     def _call_llm_analysis(self, prompt: str, model_name: str) -> str:
         """调用LLM进行分析"""
         try:
-            from langchain_ollama import ChatOllama
+            return invoke_cached(model_name, prompt, temperature=_LLM_TEMPERATURE)
             
-            llm = ChatOllama(model=model_name, temperature=0.3)
-            response = llm.invoke(prompt)
-            
-            content = getattr(response, "content", None)
+        except ImportError:
+            return "LLM分析功能需要安装 langchain-ollama 依赖包。请运行: pip install langchain-ollama"
+        except Exception as e:
+            logger.error(f"LLM分析调用失败: {e}")
+            return f"AI分析暂时不可用: {str(e)}\n\n请确认 Ollama 服务正在运行，并已安装模型 {model_name}。"
+    
+    async def _call_llm_analysis_async(self, prompt: str, model_name: str) -> str:
+        """异步调用LLM进行分析（复用当前事件循环的客户端）"""
+        try:
+            key = prompt_key(model_name, prompt)
+            content = get_cached_response(key)
             if content is None:
-                content = str(response)
-            
+                llm = get_async_chat_model(model_name, temperature=_LLM_TEMPERATURE)
+                content = response_text(await llm.ainvoke(prompt))
+                cache_response(key, content)
             return content
             
         except ImportError:
@@ -208,8 +348,8 @@ class EnhancedLLMReasoner:
             # 价格分析
             price_summary = self._analyze_price_action(df)
             
-            # 技术指标
-            technical_indicators = self.technical_analyzer.calculate_all_indicators(df)
+            # 技术指标（只需要交易信号，不计算完整指标集）
+            technical_indicators = self.technical_analyzer.calculate_signal_indicators(df)
             trading_signals = self.technical_analyzer.get_trading_signals(technical_indicators)
             
             # 构建快速分析报告
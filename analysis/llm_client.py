@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (模型名称, temperature) -> ChatOllama 实例
+_chat_models: Dict[Tuple[str, float], object] = {}
+_chat_models_lock = threading.Lock()
+
+# 事件循环 -> {(模型名称, temperature): ChatOllama}；异步客户端与创建它的事件循环绑定
+_async_chat_models: Dict[object, Dict[Tuple[str, float], object]] = {}
+
+# (模型名称, 提示词哈希) -> 响应文本；temperature=0 时相同提示词的输出可复用
+_RESPONSE_CACHE_SIZE = 256
+_response_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+# 首次使用时才导入 langchain_ollama，之后复用类引用
+_chat_ollama_class = None
+
+
+def create_chat_model(model_name: str, temperature: float):
+    """创建新的 ChatOllama 实例（未安装 langchain-ollama 时抛出 ImportError）"""
+    global _chat_ollama_class
+    if _chat_ollama_class is None:
+        from langchain_ollama import ChatOllama
+        _chat_ollama_class = ChatOllama
+
+    return _chat_ollama_class(model=model_name, temperature=temperature)
+
+
+def get_chat_model(model_name: str, temperature: float):
+    """获取共享的 ChatOllama 实例，复用其底层 HTTP 连接
+
+    仅用于同步调用；异步调用的客户端与事件循环绑定，应使用 get_async_chat_model。
+    """
+    key = (model_name, temperature)
+    llm = _chat_models.get(key)
+    if llm is None:
+        with _chat_models_lock:
+            llm = _chat_models.get(key)
+            if llm is None:
+                llm = _chat_models[key] = create_chat_model(model_name, temperature)
+    return llm
+
+
+def get_async_chat_model(model_name: str, temperature: float):
+    """获取当前事件循环共享的 ChatOllama 实例，供 ainvoke/astream 复用连接
+
+    每个事件循环各自持有实例（uvicorn 每个 worker 只有一个长期运行的事件循环），
+    已关闭事件循环的实例在下次新建时清理。
+    """
+    loop = asyncio.get_running_loop()
+    models = _async_chat_models.get(loop)
+    if models is None:
+        with _chat_models_lock:
+            for closed in [other for other in _async_chat_models if other.is_closed()]:
+                del _async_chat_models[closed]
+            models = _async_chat_models.setdefault(loop, {})
+
+    key = (model_name, temperature)
+    llm = models.get(key)
+    if llm is None:
+        llm = models[key] = create_chat_model(model_name, temperature)
+    return llm
+
+
+def warmup_model(model_name: str, temperature: float = 0.0) -> bool:
+    """发送一次极短的请求，让 Ollama 提前把模型权重加载进内存"""
+    try:
+        get_chat_model(model_name, temperature).invoke("ok")
+        logger.info(f"模型 {model_name} 预加载完成")
+        return True
+    except Exception as e:
+        logger.warning(f"模型 {model_name} 预加载失败: {e}")
+        return False
+
+
+def response_text(response) -> str:
+    """提取模型响应中的文本内容"""
+    content = getattr(response, "content", None)
+    if content is None:
+        content = str(response)
+    return content
+
+
+def prompt_key(model_name: str, prompt: str) -> Tuple[str, str]:
+    """计算响应缓存的键"""
+    digest = hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+    return model_name, digest
+
+
+def get_cached_response(key: Tuple[str, str]) -> Optional[str]:
+    """查询缓存的响应文本，未命中时返回 None"""
+    with _response_cache_lock:
+        content = _response_cache.get(key)
+        if content is not None:
+            _response_cache.move_to_end(key)
+        return content
+
+
+def cache_response(key: Tuple[str, str], content: str):
+    """缓存响应文本，超出容量时淘汰最久未使用的条目"""
+    with _response_cache_lock:
+        _response_cache[key] = content
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > _RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+
+def invoke_cached(model_name: str, prompt: str, temperature: float = 0.0) -> str:
+    """同步调用模型，相同 (模型, 提示词) 直接返回缓存结果；调用失败时异常向上抛出且不缓存"""
+    key = prompt_key(model_name, prompt)
+    content = get_cached_response(key)
+    if content is None:
+        content = response_text(get_chat_model(model_name, temperature).invoke(prompt))
+        cache_response(key, content)
+    return content
@@ -1,5 +1,6 @@
 from typing import Dict
 import pandas as pd
+from .llm_client import invoke_cached
 
 
 def summarize_price(df: pd.DataFrame, last_n: int = 30) -> Dict[str, float]:
@@ -49,18 +50,8 @@ def analyze_stock_with_llm(symbol: str, df: pd.DataFrame, model_name: str = "qwe
 - 分点列出结论，结构清晰。"""
 
     try:
-        from langchain_ollama import ChatOllama
-    except Exception as e:
+        return invoke_cached(model_name, prompt, temperature=0.0)
+    except ImportError as e:
         return f"没有安装 langchain-ollama 或相关依赖，请先 pip install langchain langchain-ollama。错误：{e}"
-
-    llm = ChatOllama(model=model_name, temperature=0.2)
-
-    try:
-        resp = llm.invoke(prompt)
     except Exception as e:
         return f"调用本地 Ollama 失败，请确认 ollama 正在运行且已 pull 模型 {model_name}。错误：{e}"
-
-    content = getattr(resp, "content", None)
-    if content is None:
-        content = str(resp)
-    return content
@@ -1,230 +1,471 @@
 import pandas as pd
 import numpy as np
-import ta
+from numpy.lib.stride_tricks import sliding_window_view
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Dict, Tuple, Optional
 import logging
+import threading
+from . import _ta_compat as ta
+from ._ta_compat import lazy_njit
 
 logger = logging.getLogger(__name__)
 
+# 指标缓存容量（按数据指纹保留最近的计算结果）
+_INDICATOR_CACHE_SIZE = 32
+
+
+@dataclass
+class OHLCV:
+    """行情数据的列式视图：每列一个连续的 float64 数组"""
+    close: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    volume: np.ndarray
+    index: pd.Index
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'OHLCV':
+        """从包含 High/Low/Close/Volume 列的DataFrame构建"""
+        def column(name):
+            return np.ascontiguousarray(df[name].to_numpy(dtype=np.float64))
+        
+        return cls(
+            close=column('Close'),
+            high=column('High'),
+            low=column('Low'),
+            volume=column('Volume'),
+            index=df.index,
+        )
+    
+    def __len__(self) -> int:
+        return len(self.close)
+    
+    def series(self, name: str) -> pd.Series:
+        """按需包装为 pd.Series（供仍需 Series 输入的计算使用）"""
+        return pd.Series(getattr(self, name), index=self.index, copy=False)
+
+
+@dataclass
+class IndicatorSnapshot:
+    """最新一根K线的指标标量及状态，供信号生成和摘要直接读取"""
+    close: Optional[float] = None
+    rsi: Optional[float] = None
+    macd: Optional[float] = None
+    macd_signal: Optional[float] = None
+    bb_upper: Optional[float] = None
+    bb_lower: Optional[float] = None
+    rsi_status: Optional[str] = None
+    macd_status: Optional[str] = None
+    bb_position: Optional[str] = None
+    nearest_support: Optional[float] = None
+    nearest_resistance: Optional[float] = None
+    
+    @classmethod
+    def from_indicators(cls, close: np.ndarray, indicators: Dict) -> 'IndicatorSnapshot':
+        """从指标字典中一次性取出各数组的最后一个值"""
+        def last(name):
+            values = indicators.get(name)
+            return float(values[-1]) if values is not None and len(values) else None
+        
+        return cls(
+            close=float(close[-1]) if len(close) else None,
+            rsi=last('rsi'),
+            macd=last('macd_line'),
+            macd_signal=last('macd_signal'),
+            bb_upper=last('bb_upper'),
+            bb_lower=last('bb_lower'),
+            rsi_status=indicators.get('rsi_status'),
+            macd_status=indicators.get('macd_status'),
+            bb_position=indicators.get('bb_position'),
+            nearest_support=indicators.get('nearest_support'),
+            nearest_resistance=indicators.get('nearest_resistance'),
+        )
+
+
+def _centered_rolling(x: np.ndarray, window: int, reducer) -> np.ndarray:
+    """居中滚动窗口聚合（与 pandas rolling(center=True) 对齐），不足一个窗口处为 NaN"""
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        offset = window // 2
+        out[offset:offset + len(x) - window + 1] = reducer(sliding_window_view(x, window), axis=1)
+    return out
+
+
+@lazy_njit
+def _sr_loop(high, low, roll_max, roll_min, window):
+    """扫描局部高低点，返回阻力位与支撑位候选"""
+    n = len(high)
+    is_res = high == roll_max
+    is_sup = low == roll_min
+    res = np.empty(n)
+    sup = np.empty(n)
+    n_res = 0
+    n_sup = 0
+    for i in range(window, n - window):
+        if is_res[i]:
+            res[n_res] = high[i]
+            n_res += 1
+        if is_sup[i]:
+            sup[n_sup] = low[i]
+            n_sup += 1
+    return res[:n_res], sup[:n_sup]
+
 
 class TechnicalAnalyzer:
     """技术分析指标计算器"""
     
     def __init__(self):
-        pass
+        # 数据指纹 -> 指标字典
+        self._indicator_cache = OrderedDict()
+        # id(indicators) -> (indicators, signals)，保留引用防止id被复用
+        self._signal_cache = OrderedDict()
+        # id(indicators) -> (indicators, 摘要文本)
+        self._summary_cache = OrderedDict()
+        # 分析器会被多个请求线程共享
+        self._cache_lock = threading.Lock()
+    
+    def warmup(self):
+        """用一小段合成数据跑一遍全部指标，提前完成 Numba 编译（或加载磁盘缓存）
+        
+        结果不写入缓存，供服务启动时在后台线程调用，避免首个请求承担编译延迟。
+        """
+        size = 64
+        close = np.linspace(100.0, 110.0, size)
+        data = OHLCV(close=close, high=close + 1.0, low=close - 1.0,
+                     volume=np.full(size, 1000.0), index=pd.RangeIndex(size))
+        
+        self.calculate_trend_indicators(data)
+        self.calculate_momentum_indicators(data)
+        self.calculate_volatility_indicators(data)
+        self.calculate_volume_indicators(data)
+        self.calculate_support_resistance(data)
+        logger.info("技术指标内核预热完成")
+    
+    @staticmethod
+    def _fingerprint(df: pd.DataFrame) -> Tuple:
+        """计算数据的廉价指纹，用于识别重复请求的同一份行情"""
+        return (
+            len(df),
+            df.index[0],
+            df.index[-1],
+            float(df['Close'].iloc[0]),
+            float(df['Close'].iloc[-1]),
+            float(df['Volume'].iloc[-1]),
+        )
+    
+    def _cache_get(self, cache: OrderedDict, key):
+        """读取LRU缓存，命中时标记为最近使用"""
+        with self._cache_lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+    
+    def _cache_put(self, cache: OrderedDict, key, value):
+        """写入LRU缓存并淘汰最旧的条目"""
+        with self._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > _INDICATOR_CACHE_SIZE:
+                cache.popitem(last=False)
     
     def calculate_all_indicators(self, df: pd.DataFrame) -> Dict:
-        """计算所有技术指标"""
+        """计算所有技术指标（相同数据直接返回缓存结果）"""
         if df is None or df.empty:
             return {}
         
+        key = self._fingerprint(df)
+        cached = self._cache_get(self._indicator_cache, key)
+        if cached is not None:
+            return cached
+        
         try:
             indicators = {}
+            data = OHLCV.from_frame(df)
             
             # 趋势指标
-            indicators.update(self.calculate_trend_indicators(df))
+            indicators.update(self.calculate_trend_indicators(data))
             
             # 动量指标
-            indicators.update(self.calculate_momentum_indicators(df))
+            indicators.update(self.calculate_momentum_indicators(data))
             
             # 波动性指标
-            indicators.update(self.calculate_volatility_indicators(df))
+            indicators.update(self.calculate_volatility_indicators(data))
             
             # 成交量指标
-            indicators.update(self.calculate_volume_indicators(df))
+            indicators.update(self.calculate_volume_indicators(data))
             
             # 支撑阻力位
-            indicators.update(self.calculate_support_resistance(df))
+            indicators.update(self.calculate_support_resistance(data))
             
+            if indicators:
+                indicators['snapshot'] = IndicatorSnapshot.from_indicators(data.close, indicators)
+                self._cache_put(self._indicator_cache, key, indicators)
             return indicators
             
         except Exception as e:
             logger.error(f"计算技术指标失败: {e}")
             return {}
     
-    def calculate_trend_indicators(self, df: pd.DataFrame) -> Dict:
+    def calculate_signal_indicators(self, df: pd.DataFrame) -> Dict:
+        """只计算交易信号需要的指标（RSI、MACD、布林带）
+        
+        供只调用 get_trading_signals 的场景使用，跳过成交量、波动性、
+        支撑阻力等其余指标；同一份数据已有完整指标缓存时直接复用。
+        """
+        if df is None or df.empty:
+            return {}
+        
+        key = self._fingerprint(df)
+        cached = self._cache_get(self._indicator_cache, key)
+        if cached is None:
+            cached = self._cache_get(self._indicator_cache, ('signal',) + key)
+        if cached is not None:
+            return cached
+        
+        try:
+            indicators = {}
+            data = OHLCV.from_frame(df)
+            
+            indicators.update(self._rsi_indicators(data.close))
+            indicators.update(self._macd_indicators(data.close))
+            indicators.update(self._bollinger_indicators(data))
+            
+            if indicators:
+                indicators['snapshot'] = IndicatorSnapshot.from_indicators(data.close, indicators)
+                self._cache_put(self._indicator_cache, ('signal',) + key, indicators)
+            return indicators
+            
+        except Exception as e:
+            logger.error(f"计算信号指标失败: {e}")
+            return {}
+    
+    def calculate_trend_indicators(self, data: OHLCV) -> Dict:
         """计算趋势指标"""
         indicators = {}
         
         try:
-            # 移动平均线
-            indicators['sma_20'] = ta.trend.sma_indicator(df['Close'], window=20)
-            indicators['sma_50'] = ta.trend.sma_indicator(df['Close'], window=50)
-            indicators['ema_12'] = ta.trend.ema_indicator(df['Close'], window=12)
-            indicators['ema_26'] = ta.trend.ema_indicator(df['Close'], window=26)
-            
-            # MACD
-            macd_line = ta.trend.macd_diff(df['Close'])
-            macd_signal = ta.trend.macd_signal(df['Close'])
-            macd_histogram = ta.trend.macd(df['Close'])
+            close = data.close
             
-            indicators['macd_line'] = macd_line
-            indicators['macd_signal'] = macd_signal
-            indicators['macd_histogram'] = macd_histogram
+            # 移动平均线
+            indicators['sma_20'] = ta.sma_indicator(close, window=20)
+            indicators['sma_50'] = ta.sma_indicator(close, window=50)
             
-            # 当前MACD状态
-            if not macd_line.empty and not macd_signal.empty:
-                current_macd = macd_line.iloc[-1]
-                current_signal = macd_signal.iloc[-1]
-                indicators['macd_status'] = 'bullish' if current_macd > current_signal else 'bearish'
+            # EMA 与 MACD
+            indicators.update(self._macd_indicators(close))
             
             # ADX (趋势强度)
-            indicators['adx'] = ta.trend.adx(df['High'], df['Low'], df['Close'])
+            indicators['adx'] = ta.adx(data.high, data.low, close)
             
             # 布林带
-            bb_high = ta.volatility.bollinger_hband(df['Close'])
-            bb_low = ta.volatility.bollinger_lband(df['Close'])
-            bb_mid = ta.volatility.bollinger_mavg(df['Close'])
-            
-            indicators['bb_upper'] = bb_high
-            indicators['bb_lower'] = bb_low
-            indicators['bb_middle'] = bb_mid
-            
-            # 布林带位置
-            if not bb_high.empty and not bb_low.empty:
-                current_price = df['Close'].iloc[-1]
-                current_upper = bb_high.iloc[-1]
-                current_lower = bb_low.iloc[-1]
-                
-                if current_price > current_upper:
-                    indicators['bb_position'] = 'above_upper'
-                elif current_price < current_lower:
-                    indicators['bb_position'] = 'below_lower'
-                else:
-                    indicators['bb_position'] = 'within_bands'
+            indicators.update(self._bollinger_indicators(data))
             
         except Exception as e:
             logger.error(f"计算趋势指标失败: {e}")
         
         return indicators
     
-    def calculate_momentum_indicators(self, df: pd.DataFrame) -> Dict:
+    @staticmethod
+    def _macd_indicators(close: np.ndarray) -> Dict:
+        """计算EMA12/EMA26及MACD快线、信号线、柱状图和当前状态"""
+        indicators = {}
+        indicators['ema_12'] = ta.ema_indicator(close, window=12)
+        indicators['ema_26'] = ta.ema_indicator(close, window=26)
+        
+        # MACD：复用上面的 EMA12/EMA26，一次计算出快线、信号线和柱状图
+        macd_line = indicators['ema_12'] - indicators['ema_26']
+        macd_signal = ta.ema_indicator(macd_line, window=9)
+        macd_histogram = macd_line - macd_signal
+        
+        indicators['macd_line'] = macd_line
+        indicators['macd_signal'] = macd_signal
+        indicators['macd_histogram'] = macd_histogram
+        
+        # 当前MACD状态
+        if len(macd_line) and len(macd_signal):
+            current_macd = macd_line[-1]
+            current_signal = macd_signal[-1]
+            indicators['macd_status'] = 'bullish' if current_macd > current_signal else 'bearish'
+        
+        return indicators
+    
+    @staticmethod
+    def _bollinger_indicators(data: OHLCV) -> Dict:
+        """计算布林带（20日，2倍标准差）及当前价格所处位置"""
+        indicators = {}
+        rolling = data.series('close').rolling(window=20)
+        bb_mid = rolling.mean().to_numpy()
+        bb_std = rolling.std(ddof=0).to_numpy()
+        bb_high = bb_mid + 2 * bb_std
+        bb_low = bb_mid - 2 * bb_std
+        
+        indicators['bb_upper'] = bb_high
+        indicators['bb_lower'] = bb_low
+        indicators['bb_middle'] = bb_mid
+        
+        # 布林带位置
+        if len(bb_high) and len(bb_low):
+            current_price = data.close[-1]
+            current_upper = bb_high[-1]
+            current_lower = bb_low[-1]
+            
+            if current_price > current_upper:
+                indicators['bb_position'] = 'above_upper'
+            elif current_price < current_lower:
+                indicators['bb_position'] = 'below_lower'
+            else:
+                indicators['bb_position'] = 'within_bands'
+        
+        return indicators
+    
+    def calculate_momentum_indicators(self, data: OHLCV) -> Dict:
         """计算动量指标"""
         indicators = {}
         
         try:
+            high, low, close = data.high, data.low, data.close
+            
             # RSI
-            rsi = ta.momentum.rsi(df['Close'])
-            indicators['rsi'] = rsi
-            
-            if not rsi.empty:
-                current_rsi = rsi.iloc[-1]
-                if current_rsi > 70:
-                    indicators['rsi_status'] = 'overbought'
-                elif current_rsi < 30:
-                    indicators['rsi_status'] = 'oversold'
-                else:
-                    indicators['rsi_status'] = 'neutral'
+            indicators.update(self._rsi_indicators(close))
             
             # 随机指标 (KDJ)
-            stoch_k = ta.momentum.stoch(df['High'], df['Low'], df['Close'])
-            stoch_d = ta.momentum.stoch_signal(df['High'], df['Low'], df['Close'])
+            stoch_k = ta.stoch(high, low, close)
+            stoch_d = ta.stoch_signal(high, low, close)
             
             indicators['stoch_k'] = stoch_k
             indicators['stoch_d'] = stoch_d
             
             # Williams %R
-            indicators['williams_r'] = ta.momentum.williams_r(df['High'], df['Low'], df['Close'])
+            indicators['williams_r'] = ta.williams_r(high, low, close)
             
             # CCI (商品通道指数)
-            indicators['cci'] = ta.trend.cci(df['High'], df['Low'], df['Close'])
+            indicators['cci'] = ta.cci(high, low, close)
             
         except Exception as e:
             logger.error(f"计算动量指标失败: {e}")
         
         return indicators
     
-    def calculate_volatility_indicators(self, df: pd.DataFrame) -> Dict:
+    @staticmethod
+    def _rsi_indicators(close: np.ndarray) -> Dict:
+        """计算RSI及超买超卖状态"""
+        indicators = {}
+        rsi = ta.rsi(close)
+        indicators['rsi'] = rsi
+        
+        if len(rsi):
+            current_rsi = rsi[-1]
+            if current_rsi > 70:
+                indicators['rsi_status'] = 'overbought'
+            elif current_rsi < 30:
+                indicators['rsi_status'] = 'oversold'
+            else:
+                indicators['rsi_status'] = 'neutral'
+        
+        return indicators
+    
+    def calculate_volatility_indicators(self, data: OHLCV) -> Dict:
         """计算波动性指标"""
         indicators = {}
         
         try:
             # ATR (平均真实波幅)
-            indicators['atr'] = ta.volatility.average_true_range(df['High'], df['Low'], df['Close'])
+            indicators['atr'] = ta.average_true_range(data.high, data.low, data.close)
             
             # 历史波动率
-            returns = df['Close'].pct_change().dropna()
+            close = data.close
+            returns = np.diff(close) / close[:-1]
             if len(returns) > 1:
-                indicators['historical_volatility'] = returns.std() * np.sqrt(252) * 100  # 年化波动率
+                indicators['historical_volatility'] = float(returns.std(ddof=1) * np.sqrt(252) * 100)  # 年化波动率
             
-            # 价格变化率
-            indicators['price_change_pct'] = df['Close'].pct_change() * 100
+            # 价格变化率（第一根K线为 NaN）
+            indicators['price_change_pct'] = np.concatenate(([np.nan], returns * 100))
             
         except Exception as e:
             logger.error(f"计算波动性指标失败: {e}")
         
         return indicators
     
-    def calculate_volume_indicators(self, df: pd.DataFrame) -> Dict:
+    def calculate_volume_indicators(self, data: OHLCV) -> Dict:
         """计算成交量指标"""
         indicators = {}
         
         try:
+            close, volume = data.close, data.volume
+            
             # 成交量移动平均
-            indicators['volume_sma'] = ta.volume.volume_sma(df['Close'], df['Volume'])
+            indicators['volume_sma'] = ta.volume_sma(volume)
             
             # OBV (能量潮)
-            indicators['obv'] = ta.volume.on_balance_volume(df['Close'], df['Volume'])
+            indicators['obv'] = ta.on_balance_volume(close, volume)
             
             # 成交量价格趋势 (VPT)
-            indicators['vpt'] = ta.volume.volume_price_trend(df['Close'], df['Volume'])
+            indicators['vpt'] = ta.volume_price_trend(close, volume)
             
             # 资金流量指数 (MFI)
-            indicators['mfi'] = ta.volume.money_flow_index(df['High'], df['Low'], df['Close'], df['Volume'])
+            indicators['mfi'] = ta.money_flow_index(data.high, data.low, close, volume)
             
         except Exception as e:
             logger.error(f"计算成交量指标失败: {e}")
         
         return indicators
     
-    def calculate_support_resistance(self, df: pd.DataFrame, window: int = 20) -> Dict:
+    def calculate_support_resistance(self, data: OHLCV, window: int = 20) -> Dict:
         """计算支撑阻力位"""
         indicators = {}
         
         try:
-            if len(df) < window:
+            if len(data) < window:
                 return indicators
             
             # 使用滚动窗口找局部高低点
-            highs = df['High'].rolling(window=window, center=True).max()
-            lows = df['Low'].rolling(window=window, center=True).min()
+            highs = _centered_rolling(data.high, window, np.max)
+            lows = _centered_rolling(data.low, window, np.min)
             
             # 找出支撑位和阻力位
-            resistance_levels = []
-            support_levels = []
-            
-            for i in range(window, len(df) - window):
-                if df['High'].iloc[i] == highs.iloc[i]:
-                    resistance_levels.append(df['High'].iloc[i])
-                if df['Low'].iloc[i] == lows.iloc[i]:
-                    support_levels.append(df['Low'].iloc[i])
+            resistance, support = _sr_loop(data.high, data.low, highs, lows, window)
             
             # 去重并排序
-            resistance_levels = sorted(list(set(resistance_levels)), reverse=True)[:5]
-            support_levels = sorted(list(set(support_levels)))[:5]
-            
-            indicators['resistance_levels'] = resistance_levels
-            indicators['support_levels'] = support_levels
-            
-            # 当前价格相对位置
-            current_price = df['Close'].iloc[-1]
-            if resistance_levels:
-                nearest_resistance = min(resistance_levels, key=lambda x: abs(x - current_price) if x > current_price else float('inf'))
-                if nearest_resistance != float('inf'):
-                    indicators['nearest_resistance'] = nearest_resistance
-            
-            if support_levels:
-                nearest_support = max(support_levels, key=lambda x: x if x < current_price else 0)
-                if nearest_support > 0:
-                    indicators['nearest_support'] = nearest_support
+            resistance_levels = np.unique(resistance)[::-1][:5]
+            support_levels = np.unique(support)[:5]
+            
+            indicators['resistance_levels'] = resistance_levels.tolist()
+            indicators['support_levels'] = support_levels.tolist()
+            
+            # 当前价格相对位置：上方最近的阻力位、下方最近的支撑位
+            current_price = data.close[-1]
+            if len(resistance_levels):
+                distance = np.where(resistance_levels > current_price, resistance_levels - current_price, np.inf)
+                i = np.argmin(distance)
+                if np.isfinite(distance[i]):
+                    indicators['nearest_resistance'] = float(resistance_levels[i])
+            
+            if len(support_levels):
+                distance = np.where(support_levels < current_price, current_price - support_levels, np.inf)
+                i = np.argmin(distance)
+                if np.isfinite(distance[i]):
+                    indicators['nearest_support'] = float(support_levels[i])
             
         except Exception as e:
             logger.error(f"计算支撑阻力位失败: {e}")
         
         return indicators
     
+    @staticmethod
+    def _snapshot(indicators: Dict) -> IndicatorSnapshot:
+        """取出指标字典附带的快照；外部构造的字典没有快照时现场生成"""
+        snapshot = indicators.get('snapshot')
+        if snapshot is None:
+            snapshot = IndicatorSnapshot.from_indicators(np.empty(0), indicators)
+        return snapshot
+    
     def get_trading_signals(self, indicators: Dict) -> Dict:
-        """基于技术指标生成交易信号"""
+        """基于技术指标生成交易信号（同一指标字典复用上次结果）"""
+        cached = self._cache_get(self._signal_cache, id(indicators))
+        if cached is not None and cached[0] is indicators:
+            return cached[1]
+        
         signals = {
             'overall_signal': 'neutral',
             'signal_strength': 0,
@@ -232,23 +473,24 @@ class TechnicalAnalyzer:
         }
         
         try:
+            snapshot = self._snapshot(indicators)
             signal_count = 0
             total_signals = 0
             
             # RSI信号
-            if 'rsi_status' in indicators:
+            if snapshot.rsi_status is not None:
                 total_signals += 1
-                if indicators['rsi_status'] == 'oversold':
+                if snapshot.rsi_status == 'oversold':
                     signals['signals'].append('RSI超卖，可能反弹')
                     signal_count += 1
-                elif indicators['rsi_status'] == 'overbought':
+                elif snapshot.rsi_status == 'overbought':
                     signals['signals'].append('RSI超买，可能回调')
                     signal_count -= 1
             
             # MACD信号
-            if 'macd_status' in indicators:
+            if snapshot.macd_status is not None:
                 total_signals += 1
-                if indicators['macd_status'] == 'bullish':
+                if snapshot.macd_status == 'bullish':
                     signals['signals'].append('MACD金叉，趋势向好')
                     signal_count += 1
                 else:
@@ -256,12 +498,12 @@ class TechnicalAnalyzer:
                     signal_count -= 1
             
             # 布林带信号
-            if 'bb_position' in indicators:
+            if snapshot.bb_position is not None:
                 total_signals += 1
-                if indicators['bb_position'] == 'below_lower':
+                if snapshot.bb_position == 'below_lower':
                     signals['signals'].append('价格跌破布林带下轨，超卖')
                     signal_count += 1
-                elif indicators['bb_position'] == 'above_upper':
+                elif snapshot.bb_position == 'above_upper':
                     signals['signals'].append('价格突破布林带上轨，超买')
                     signal_count -= 1
             
@@ -277,43 +519,47 @@ class TechnicalAnalyzer:
                 else:
                     signals['overall_signal'] = 'neutral'
             
+            if indicators:
+                self._cache_put(self._signal_cache, id(indicators), (indicators, signals))
+            
         except Exception as e:
             logger.error(f"生成交易信号失败: {e}")
         
         return signals
     
     def format_indicators_summary(self, indicators: Dict) -> str:
-        """格式化技术指标摘要"""
+        """格式化技术指标摘要（同一指标字典复用上次结果）"""
+        cached = self._cache_get(self._summary_cache, id(indicators))
+        if cached is not None and cached[0] is indicators:
+            return cached[1]
+        
         try:
+            snapshot = self._snapshot(indicators)
             summary_lines = []
             
             # RSI
-            if 'rsi' in indicators and not indicators['rsi'].empty:
-                current_rsi = indicators['rsi'].iloc[-1]
-                rsi_status = indicators.get('rsi_status', 'neutral')
-                summary_lines.append(f"RSI: {current_rsi:.2f} ({rsi_status})")
+            if snapshot.rsi is not None:
+                summary_lines.append(f"RSI: {snapshot.rsi:.2f} ({snapshot.rsi_status or 'neutral'})")
             
             # MACD
-            if 'macd_line' in indicators and not indicators['macd_line'].empty:
-                current_macd = indicators['macd_line'].iloc[-1]
-                macd_status = indicators.get('macd_status', 'neutral')
-                summary_lines.append(f"MACD: {current_macd:.4f} ({macd_status})")
+            if snapshot.macd is not None:
+                summary_lines.append(f"MACD: {snapshot.macd:.4f} ({snapshot.macd_status or 'neutral'})")
             
             # 布林带
-            if 'bb_position' in indicators:
-                bb_position = indicators['bb_position']
-                summary_lines.append(f"布林带位置: {bb_position}")
+            if snapshot.bb_position is not None:
+                summary_lines.append(f"布林带位置: {snapshot.bb_position}")
             
             # 支撑阻力
-            if 'nearest_support' in indicators:
-                support = indicators['nearest_support']
-                summary_lines.append(f"最近支撑位: {support:.2f}")
+            if snapshot.nearest_support is not None:
+                summary_lines.append(f"最近支撑位: {snapshot.nearest_support:.2f}")
             
-            if 'nearest_resistance' in indicators:
-                resistance = indicators['nearest_resistance']
-                summary_lines.append(f"最近阻力位: {resistance:.2f}")
+            if snapshot.nearest_resistance is not None:
+                summary_lines.append(f"最近阻力位: {snapshot.nearest_resistance:.2f}")
             
-            return "\n".join(summary_lines) if summary_lines else "暂无技术指标数据"
+            summary = "\n".join(summary_lines) if summary_lines else "暂无技术指标数据"
+            if indicators:
+                self._cache_put(self._summary_cache, id(indicators), (indicators, summary))
+            return summary
             
         except Exception as e:
             logger.error(f"格式化指标摘要失败: {e}")
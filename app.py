@@ -1,100 +1,242 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, stream_with_context
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import threading
 import yaml
 import logging
+import numpy as np
 import pandas as pd
-from data_fetcher.enhanced_stock_data import EnhancedStockDataFetcher
+from data_fetcher.enhanced_stock_data import EnhancedStockDataFetcher, is_valid_symbol
 from analysis.enhanced_llm_reasoner import EnhancedLLMReasoner
 from analysis.technical_indicators import TechnicalAnalyzer
+from analysis.llm_client import warmup_model
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 设置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+# 模板不在运行时修改，不必每次渲染都检查文件时间（调试模式下在启动时重新开启）
+app.config["TEMPLATES_AUTO_RELOAD"] = False
+
+
+def _json_default(obj):
+    """标准库 json 的回退序列化：NumPy 标量和数组转为 Python 对象"""
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_bytes(obj) -> bytes:
+    """用 orjson 序列化（可直接处理 NumPy 类型，NaN 输出为 null），未安装时退回标准库 json"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def jsonify_fast(obj):
+    """以 json_bytes 的编码构造 JSON 响应"""
+    return app.response_class(json_bytes(obj), mimetype="application/json")
+
 
 # 初始化组件
 data_fetcher = EnhancedStockDataFetcher()
-llm_analyzer = EnhancedLLMReasoner()
 technical_analyzer = TechnicalAnalyzer()
+llm_analyzer = EnhancedLLMReasoner(technical_analyzer)
+
+# 优先使用 libyaml 提供的 C 解析器
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 with open("config.yaml", "r", encoding="utf-8") as f:
-    config = yaml.safe_load(f)
+    config = yaml.load(f, Loader=_YAML_LOADER)
 
 alpha_cfg = config.get("alpha_vantage", {})
 API_KEY = alpha_cfg.get("api_key", "")
 BASE_URL = alpha_cfg.get("base_url", "https://www.alphavantage.co/query")
+HAS_VALID_AV_KEY = bool(API_KEY) and API_KEY != "YOUR_ALPHA_VANTAGE_KEY"
+
+# 模型档位：fast 使用 Q4_K_M 量化（解码更快），accurate 使用 Q8_0 量化（精度更高）
+LLM_MODEL_TIERS = {
+    "fast": "qwen2.5:7b-instruct-q4_K_M",
+    "accurate": "qwen2.5:7b-instruct-q8_0",
+}
 
 llm_cfg = config.get("llm", {})
 LLM_ENABLE = bool(llm_cfg.get("enable", False))
-LLM_MODEL = llm_cfg.get("model_name", "qwen2.5")
+# 显式指定的 model_name 优先于 model_tier
+LLM_MODEL = llm_cfg.get("model_name") or LLM_MODEL_TIERS.get(
+    llm_cfg.get("model_tier", "fast"), LLM_MODEL_TIERS["fast"])
 
 DEFAULT_SYMBOL = config.get("default_symbol", "AAPL")
 
+# 后台预热指标内核与预加载模型，避免首个请求承担编译和冷启动延迟
+threading.Thread(target=technical_analyzer.warmup, daemon=True).start()
+if LLM_ENABLE:
+    threading.Thread(target=warmup_model, args=(LLM_MODEL,), daemon=True).start()
+
+# 单次批量分析允许的最大股票数量
+MAX_BATCH_SYMBOLS = 10
+MAX_BULK_SYMBOLS = 50
+
+# NDJSON 流式接口每次转换并发送的K线条数
+NDJSON_CHUNK_ROWS = 1000
+
+# 批量接口的线程池：数据获取与LLM调用以网络I/O为主，线程可以并行等待
+BULK_MAX_WORKERS = 8
+bulk_executor = ThreadPoolExecutor(max_workers=BULK_MAX_WORKERS, thread_name_prefix="bulk")
+
 
 @app.route("/")
 def index():
     return render_template("index.html", default_symbol=DEFAULT_SYMBOL, llm_enabled=LLM_ENABLE)
 
 
-@app.get("/api/stock")
-def api_stock():
-    symbol = request.args.get("symbol", "").strip().upper()
-    if not symbol:
-        return jsonify({"error": "缺少股票代码 symbol"}), 400
-
-    if not API_KEY or API_KEY == "YOUR_ALPHA_VANTAGE_KEY":
-        return jsonify({"error": "请先在 config.yaml 中配置 alpha_vantage.api_key"}), 500
-
+def fetch_stock_data(symbol: str, period: str, interval: str):
+    """获取行情数据，yfinance 失败时回退到 Alpha Vantage"""
     # 使用增强的数据获取器
-    df = data_fetcher.get_stock_data(symbol, period="1mo", interval="5min", source='yfinance')
+    df = data_fetcher.get_stock_data(symbol, period, interval, 'yfinance')
     if df is None:
         # 尝试使用Alpha Vantage作为备用
-        if API_KEY and API_KEY != "YOUR_ALPHA_VANTAGE_KEY":
-            df = data_fetcher.get_stock_data(symbol, period="1mo", interval="5min", source='alpha_vantage', 
+        if HAS_VALID_AV_KEY:
+            df = data_fetcher.get_stock_data(symbol, period, interval, 'alpha_vantage', 
                                            api_key=API_KEY, base_url=BASE_URL)
-    
-    if df is None or df.empty:
-        return jsonify({"error": f"无法获取 {symbol} 的行情数据"}), 500
+    return df
+
+
+def fetch_intraday_data(symbol: str):
+    """获取 /api/stock 使用的5分钟线数据"""
+    return fetch_stock_data(symbol, "1mo", "5min")
 
-    first_row = df.iloc[0]
-    last_row = df.iloc[-1]
 
-    summary = {
+def build_summary(symbol: str, df: pd.DataFrame) -> dict:
+    """/api/stock 的行情概要（直接在列数组上取值，不构造行 Series）"""
+    close = df["Close"].to_numpy(dtype=np.float64)
+    first_close, last_close = close[0], close[-1]
+    change = last_close - first_close
+
+    return {
         "symbol": symbol,
         "first_time": df.index[0].isoformat(),
         "last_time": df.index[-1].isoformat(),
-        "first_close": float(first_row["Close"]),
-        "last_close": float(last_row["Close"]),
-        "change": float(last_row["Close"] - first_row["Close"]),
-        "change_pct": float((last_row["Close"] - first_row["Close"]) / first_row["Close"] * 100)
-        if first_row["Close"] != 0 else 0.0,
-        "high": float(df["High"].max()),
-        "low": float(df["Low"].min()),
+        "first_close": first_close,
+        "last_close": last_close,
+        "change": change,
+        "change_pct": change / first_close * 100 if first_close != 0 else 0.0,
+        "high": np.nanmax(df["High"].to_numpy(dtype=np.float64)),
+        "low": np.nanmin(df["Low"].to_numpy(dtype=np.float64)),
     }
 
-    points = [
-        {"time": idx.isoformat(), "close": float(row["Close"])}
-        for idx, row in df.iterrows()
+
+def build_points(df: pd.DataFrame) -> list:
+    """/api/stock 的收盘价走势点"""
+    times = [ts.isoformat() for ts in df.index]
+    closes = df["Close"].to_numpy(dtype=float).tolist()
+    return [{"time": t, "close": c} for t, c in zip(times, closes)]
+
+
+def build_ohlcv_records(df: pd.DataFrame) -> list:
+    """/api/stock_data 的K线数据（按列取出数组后组装，避免逐行构造 Series）"""
+    if isinstance(df.index, pd.DatetimeIndex):
+        dates = df.index.strftime("%Y-%m-%d %H:%M:%S").tolist()
+    else:
+        dates = df.index.astype(str).tolist()
+    opens, highs, lows, closes = (df[name].to_numpy(dtype=np.float64).tolist()
+                                  for name in ("Open", "High", "Low", "Close"))
+    volumes = df["Volume"].to_numpy(dtype=np.int64).tolist()
+    
+    return [
+        {"date": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for d, o, h, l, c, v in zip(dates, opens, highs, lows, closes, volumes)
     ]
 
-    # 获取股票基本信息
-    stock_info = data_fetcher.get_stock_info(symbol)
+
+def iter_ohlcv_ndjson(df: pd.DataFrame):
+    """逐块生成 NDJSON 格式的K线数据（每行一条记录），内存占用只与块大小有关"""
+    for start in range(0, len(df), NDJSON_CHUNK_ROWS):
+        records = build_ohlcv_records(df.iloc[start:start + NDJSON_CHUNK_ROWS])
+        if orjson is not None:
+            yield b"".join(orjson.dumps(record) + b"\n" for record in records)
+        else:
+            yield "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+
+
+def select_analysis(symbol: str, df: pd.DataFrame, stock_info: dict, technical_summary: str,
+                    analysis_type: str) -> str:
+    """按 analysis_type (quick, full, technical) 生成 /api/stock_data 的分析文本"""
+    if analysis_type == "technical":
+        # 仅技术分析，直接使用已格式化的指标摘要
+        return technical_summary
+    if analysis_type == "full" and LLM_ENABLE:
+        # 完整AI分析
+        try:
+            return llm_analyzer.comprehensive_analysis(symbol, df, stock_info, LLM_MODEL)
+        except Exception as e:
+            logger.error(f"LLM分析失败: {e}")
+    # 快速分析
+    return llm_analyzer.quick_analysis(symbol, df)
+
+
+def build_index_overview(df: pd.DataFrame) -> dict:
+    """单个市场指数的概览数据"""
+    close = df['Close'].to_numpy(dtype=np.float64)
+    change = close[-1] - close[0]
+    change_pct = change / close[0] * 100 if close[0] != 0 else 0
+    
+    return {
+        "current_price": close[-1],
+        "change": change,
+        "change_pct": change_pct,
+        "high": np.nanmax(df['High'].to_numpy(dtype=np.float64)),
+        "low": np.nanmin(df['Low'].to_numpy(dtype=np.float64)),
+        "volume": int(np.nansum(df['Volume'].to_numpy(dtype=np.float64)))
+    }
+
+
+@app.get("/api/stock")
+def api_stock():
+    symbol = request.args.get("symbol", "").strip().upper()
+    if not symbol:
+        return jsonify_fast({"error": "缺少股票代码 symbol"}), 400
+    if not is_valid_symbol(symbol):
+        return jsonify_fast({"error": f"无效的股票代码: {symbol}"}), 400
+
+    if not HAS_VALID_AV_KEY:
+        return jsonify_fast({"error": "请先在 config.yaml 中配置 alpha_vantage.api_key"}), 500
+
+    # analysis=0 时跳过分析文本，由客户端通过 /api/stock/stream 流式获取
+    with_analysis = request.args.get("analysis", "1") != "0"
+
+    df = fetch_intraday_data(symbol)
+    if df is None or df.empty:
+        return jsonify_fast({"error": f"无法获取 {symbol} 的行情数据"}), 500
+
+    summary = build_summary(symbol, df)
+    points = build_points(df)
+
+    # 股票基本信息只有 LLM 分析会用到，其余情况省去一次 yfinance 请求
+    stock_info = data_fetcher.get_stock_info(symbol) if with_analysis and LLM_ENABLE else {"symbol": symbol}
     
     # 技术分析
     technical_indicators = technical_analyzer.calculate_all_indicators(df)
     trading_signals = technical_analyzer.get_trading_signals(technical_indicators)
     
     analysis_text = None
-    if LLM_ENABLE:
+    if with_analysis and LLM_ENABLE:
         try:
             analysis_text = llm_analyzer.comprehensive_analysis(symbol, df, stock_info, LLM_MODEL)
         except Exception as e:
             logger.error(f"LLM分析失败: {e}")
             analysis_text = llm_analyzer.quick_analysis(symbol, df)
-    else:
+    elif with_analysis:
         analysis_text = llm_analyzer.quick_analysis(symbol, df)
 
-    return jsonify({
+    return jsonify_fast({
         "summary": summary,
         "points": points,
         "llm_analysis": analysis_text,
@@ -105,6 +247,55 @@ def api_stock():
     })
 
 
+@app.get("/api/stock/stream")
+def api_stock_stream():
+    """以 Server-Sent Events 流式返回分析文本"""
+    symbol = request.args.get("symbol", "").strip().upper()
+    if not symbol:
+        return jsonify_fast({"error": "缺少股票代码 symbol"}), 400
+    if not is_valid_symbol(symbol):
+        return jsonify_fast({"error": f"无效的股票代码: {symbol}"}), 400
+
+    # 指定 period/interval 时与 /api/stock_data 分析同一份数据，否则沿用 /api/stock 的5分钟线
+    period = request.args.get("period")
+    interval = request.args.get("interval")
+    if period or interval:
+        df = fetch_stock_data(symbol, period or "1mo", interval or "1d")
+    else:
+        df = fetch_intraday_data(symbol)
+    if df is None or df.empty:
+        return jsonify_fast({"error": f"无法获取 {symbol} 的行情数据"}), 500
+
+    def event(payload):
+        return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    def generate():
+        if LLM_ENABLE:
+            stock_info = data_fetcher.get_stock_info(symbol)
+            for chunk in llm_analyzer.comprehensive_analysis_stream(symbol, df, stock_info, LLM_MODEL):
+                yield event({"delta": chunk})
+        else:
+            yield event({"delta": llm_analyzer.quick_analysis(symbol, df)})
+        yield event({"done": True})
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/api/stock_data_stream")
+def api_stock_data_stream():
+    """以 NDJSON 流式返回K线数据，适合长周期的分钟级数据"""
+    symbol = request.args.get("symbol", DEFAULT_SYMBOL)
+    period = request.args.get("period", "1mo")
+    interval = request.args.get("interval", "1d")
+    
+    df = fetch_stock_data(symbol, period, interval)
+    if df is None:
+        return jsonify_fast({"error": "Failed to fetch stock data"}), 500
+    
+    return Response(iter_ohlcv_ndjson(df), mimetype="application/x-ndjson")
+
+
 @app.route("/api/stock_data")
 def api_stock_data():
     """新的增强API端点，支持更多参数和功能"""
@@ -115,53 +306,24 @@ def api_stock_data():
     
     try:
         # 获取股票数据
-        df = data_fetcher.get_stock_data(symbol, period, interval, 'yfinance')
-        
-        if df is None:
-            # 尝试使用Alpha Vantage作为备用
-            if API_KEY and API_KEY != "YOUR_ALPHA_VANTAGE_KEY":
-                df = data_fetcher.get_stock_data(symbol, period, interval, 'alpha_vantage', 
-                                               api_key=API_KEY, base_url=BASE_URL)
+        df = fetch_stock_data(symbol, period, interval)
         
         if df is None:
-            return jsonify({"error": "Failed to fetch stock data"}), 500
+            return jsonify_fast({"error": "Failed to fetch stock data"}), 500
         
         # 获取股票基本信息
         stock_info = data_fetcher.get_stock_info(symbol)
         
         # 转换为前端需要的格式
-        data = []
-        for index, row in df.iterrows():
-            data.append({
-                "date": index.strftime("%Y-%m-%d %H:%M:%S") if hasattr(index, 'strftime') else str(index),
-                "open": float(row["Open"]),
-                "high": float(row["High"]),
-                "low": float(row["Low"]),
-                "close": float(row["Close"]),
-                "volume": int(row["Volume"])
-            })
+        data = build_ohlcv_records(df)
         
         # 技术指标分析
         technical_indicators = technical_analyzer.calculate_all_indicators(df)
         trading_signals = technical_analyzer.get_trading_signals(technical_indicators)
+        technical_summary = technical_analyzer.format_indicators_summary(technical_indicators)
         
         # 分析结果
-        analysis = ""
-        if analysis_type == "technical":
-            # 仅技术分析
-            analysis = technical_analyzer.format_indicators_summary(technical_indicators)
-        elif analysis_type == "quick":
-            # 快速分析
-            analysis = llm_analyzer.quick_analysis(symbol, df)
-        elif analysis_type == "full" and LLM_ENABLE:
-            # 完整AI分析
-            try:
-                analysis = llm_analyzer.comprehensive_analysis(symbol, df, stock_info, LLM_MODEL)
-            except Exception as e:
-                logger.error(f"LLM分析失败: {e}")
-                analysis = llm_analyzer.quick_analysis(symbol, df)
-        else:
-            analysis = llm_analyzer.quick_analysis(symbol, df)
+        analysis = select_analysis(symbol, df, stock_info, technical_summary, analysis_type)
         
         # 构建响应
         response_data = {
@@ -172,16 +334,130 @@ def api_stock_data():
             "analysis": analysis,
             "stock_info": stock_info,
             "technical_indicators": {
-                "summary": technical_analyzer.format_indicators_summary(technical_indicators),
+                "summary": technical_summary,
                 "signals": trading_signals
             }
         }
         
-        return jsonify(response_data)
+        return jsonify_fast(response_data)
         
     except Exception as e:
         logger.error(f"API错误: {e}")
-        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+        return jsonify_fast({"error": f"Internal server error: {str(e)}"}), 500
+
+
+def parse_symbols(value: str):
+    """解析逗号分隔的股票代码列表"""
+    return [s.strip().upper() for s in value.split(",") if s.strip()]
+
+
+def analyze_symbol(symbol: str, period: str, interval: str, with_llm: bool):
+    """获取单只股票数据并完成技术分析（在批量接口的线程池中执行）"""
+    try:
+        df = data_fetcher.get_stock_data(symbol, period, interval, 'yfinance')
+        if df is None or df.empty:
+            return {"symbol": symbol, "error": f"无法获取 {symbol} 的行情数据"}
+
+        technical_indicators = technical_analyzer.calculate_all_indicators(df)
+        trading_signals = technical_analyzer.get_trading_signals(technical_indicators)
+
+        if with_llm:
+            stock_info = data_fetcher.get_stock_info(symbol)
+            analysis = llm_analyzer.comprehensive_analysis(symbol, df, stock_info, LLM_MODEL)
+        else:
+            analysis = llm_analyzer.quick_analysis(symbol, df)
+
+        first_close = float(df["Close"].iloc[0])
+        last_close = float(df["Close"].iloc[-1])
+        return {
+            "symbol": symbol,
+            "last_close": last_close,
+            "change_pct": (last_close - first_close) / first_close * 100 if first_close != 0 else 0.0,
+            "technical_summary": technical_analyzer.format_indicators_summary(technical_indicators),
+            "trading_signals": trading_signals,
+            "analysis": analysis,
+            "error": None,
+        }
+
+    except Exception as e:
+        logger.error(f"分析 {symbol} 失败: {e}")
+        return {"symbol": symbol, "error": str(e)}
+
+
+@app.route("/api/bulk")
+def api_bulk():
+    """并行分析多只股票，每只股票独立获取数据和分析"""
+    symbols = parse_symbols(request.args.get("symbols", ""))
+    period = request.args.get("period", "1mo")
+    interval = request.args.get("interval", "1d")
+    analysis_type = request.args.get("analysis_type", "quick")  # quick, full
+
+    if not symbols:
+        return jsonify_fast({"error": "缺少股票代码 symbols"}), 400
+    if len(symbols) > MAX_BULK_SYMBOLS:
+        return jsonify_fast({"error": f"一次最多分析 {MAX_BULK_SYMBOLS} 只股票"}), 400
+
+    with_llm = analysis_type == "full" and LLM_ENABLE
+    results = list(bulk_executor.map(
+        lambda symbol: analyze_symbol(symbol, period, interval, with_llm), symbols))
+
+    return jsonify_fast({"results": results})
+
+
+def batch_results(symbols, period: str, interval: str) -> list:
+    """并发获取多只股票数据，并在一次LLM调用中完成分析"""
+    # 股票信息与行情数据同时在各自的线程池中获取
+    info_futures = [bulk_executor.submit(data_fetcher.get_stock_info, symbol) for symbol in symbols] \
+        if LLM_ENABLE else None
+    frames = data_fetcher.get_multiple_stocks(symbols, period, interval)
+
+    items = []
+    results = []
+    for i, symbol in enumerate(symbols):
+        df = frames.get(symbol)
+        if df is None or df.empty:
+            results.append({"symbol": symbol, "analysis": None, "error": f"无法获取 {symbol} 的行情数据"})
+            continue
+        stock_info = info_futures[i].result() if info_futures else None
+        items.append((symbol, df, stock_info))
+        results.append({"symbol": symbol, "analysis": None, "error": None})
+
+    if LLM_ENABLE:
+        analyses = llm_analyzer.batch_analysis(items, LLM_MODEL)
+    else:
+        analyses = [llm_analyzer.quick_analysis(symbol, df) for symbol, df, _ in items]
+
+    pending = iter(analyses)
+    for result in results:
+        if result["error"] is None:
+            result["analysis"] = next(pending)
+    return results
+
+
+@app.route("/api/batch")
+def api_batch():
+    """在一次LLM调用中批量分析多只股票"""
+    symbols = parse_symbols(request.args.get("symbols", ""))
+    period = request.args.get("period", "1mo")
+    interval = request.args.get("interval", "1d")
+
+    if not symbols:
+        return jsonify_fast({"error": "缺少股票代码 symbols"}), 400
+    if len(symbols) > MAX_BATCH_SYMBOLS:
+        return jsonify_fast({"error": f"一次最多分析 {MAX_BATCH_SYMBOLS} 只股票"}), 400
+
+    try:
+        return jsonify_fast({"results": batch_results(symbols, period, interval)})
+
+    except Exception as e:
+        logger.error(f"批量分析API错误: {e}")
+        return jsonify_fast({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@app.route("/api/cache/stats")
+def api_cache_stats():
+    """数据缓存命中统计"""
+    return jsonify_fast(data_fetcher.cache_stats())
 
 
 @app.route("/api/market_overview")
@@ -193,25 +469,13 @@ def api_market_overview():
         overview = {}
         for name, df in indices.items():
             if df is not None and not df.empty:
-                latest = df.iloc[-1]
-                first = df.iloc[0]
-                change = float(latest['Close'] - first['Close'])
-                change_pct = float(change / first['Close'] * 100) if first['Close'] != 0 else 0
-                
-                overview[name] = {
-                    "current_price": float(latest['Close']),
-                    "change": change,
-                    "change_pct": change_pct,
-                    "high": float(df['High'].max()),
-                    "low": float(df['Low'].min()),
-                    "volume": int(df['Volume'].sum())
-                }
+                overview[name] = build_index_overview(df)
         
-        return jsonify({"market_overview": overview})
+        return jsonify_fast({"market_overview": overview})
         
     except Exception as e:
         logger.error(f"市场概览API错误: {e}")
-        return jsonify({"error": f"Failed to fetch market overview: {str(e)}"}), 500
+        return jsonify_fast({"error": f"Failed to fetch market overview: {str(e)}"}), 500
 
 
 if __name__ == "__main__":
@@ -220,13 +484,15 @@ if __name__ == "__main__":
     # 解析命令行参数
     host = "0.0.0.0"
     port = 12000
-    debug = True
+    debug = False
     
     for i, arg in enumerate(sys.argv):
         if arg == "--host" and i + 1 < len(sys.argv):
             host = sys.argv[i + 1]
         elif arg == "--port" and i + 1 < len(sys.argv):
             port = int(sys.argv[i + 1])
+        elif arg == "--debug":
+            debug = True
         elif arg == "--no-debug":
             debug = False
     
@@ -235,10 +501,16 @@ if __name__ == "__main__":
         server_cfg = config.get("server", {})
         host = server_cfg.get("host", "127.0.0.1")
         port = int(server_cfg.get("port", 5000))
-        debug = bool(server_cfg.get("debug", True))
+        debug = bool(server_cfg.get("debug", False))
 
     print(f"🚀 启动智能理财炒股 Agent 服务器...")
     print(f"📍 地址: http://{host}:{port}")
     print(f"🔧 调试模式: {'开启' if debug else '关闭'}")
+    if LLM_ENABLE:
+        num_parallel = os.environ.get("OLLAMA_NUM_PARALLEL")
+        print(f"🤖 LLM模型: {LLM_MODEL}，OLLAMA_NUM_PARALLEL={num_parallel or '未设置'}")
+        if not num_parallel:
+            print("   提示: 启动 ollama serve 前设置 OLLAMA_NUM_PARALLEL (如 4) 可并发处理多个分析请求")
     
+    app.config["TEMPLATES_AUTO_RELOAD"] = debug
     app.run(host=host, port=port, debug=debug)
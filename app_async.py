@@ -0,0 +1,262 @@
+"""智能理财炒股 Agent 的 ASGI 版本（FastAPI），接口与 app.py 一致
+
+互不依赖的网络请求（行情数据、股票信息）通过 asyncio.gather 并发执行，
+阻塞的 yfinance / pandas 调用放入线程池，LLM 分析使用异步客户端，
+单个 worker 可以同时处理大量等待上游响应的请求。
+
+启动方式:
+    uvicorn app_async:app --host 0.0.0.0 --port 12000 --workers 4
+    # 安装 uvloop 后可追加 --loop uvloop
+"""
+import asyncio
+import json
+import logging
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.templating import Jinja2Templates
+
+from data_fetcher.enhanced_stock_data import is_valid_symbol
+from app import (
+    DEFAULT_SYMBOL, HAS_VALID_AV_KEY, LLM_ENABLE, LLM_MODEL, MAX_BATCH_SYMBOLS, MAX_BULK_SYMBOLS,
+    analyze_symbol, batch_results, build_index_overview, build_ohlcv_records, build_points,
+    build_summary, data_fetcher, fetch_intraday_data, fetch_stock_data, iter_ohlcv_ndjson, json_bytes,
+    llm_analyzer, parse_symbols, select_analysis, technical_analyzer,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FastJSONResponse(JSONResponse):
+    """与 Flask 版 jsonify_fast 相同的编码：NaN 输出为 null，而不是像默认 JSONResponse 那样报错"""
+
+    def render(self, content) -> bytes:
+        return json_bytes(content)
+
+
+app = FastAPI(title="智能理财炒股 Agent", default_response_class=FastJSONResponse)
+app.mount("/static", StaticFiles(directory="static"), name="static")
+
+templates = Jinja2Templates(directory="templates")
+
+
+def _static_url_for(endpoint: str, filename: str) -> str:
+    """兼容模板中 Flask 风格的 url_for('static', filename=...)"""
+    return f"/static/{filename}"
+
+
+templates.env.globals["url_for"] = _static_url_for
+
+
+def error_response(message: str, status_code: int) -> JSONResponse:
+    return FastJSONResponse({"error": message}, status_code=status_code)
+
+
+def sse_event(payload) -> str:
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+async def stock_analysis_text(symbol: str, df, stock_info) -> str:
+    """LLM 分析（异步调用，不占用线程）；未启用或失败时回退到快速分析"""
+    if LLM_ENABLE:
+        try:
+            return await llm_analyzer.comprehensive_analysis_async(symbol, df, stock_info, LLM_MODEL)
+        except Exception as e:
+            logger.error(f"LLM分析失败: {e}")
+    return await asyncio.to_thread(llm_analyzer.quick_analysis, symbol, df)
+
+
+def stock_payload(symbol: str, df) -> dict:
+    """/api/stock 中与 LLM 无关的部分：行情概要、走势点和技术指标"""
+    technical_indicators = technical_analyzer.calculate_all_indicators(df)
+    return {
+        "summary": build_summary(symbol, df),
+        "points": build_points(df),
+        "technical_summary": technical_analyzer.format_indicators_summary(technical_indicators),
+        "trading_signals": technical_analyzer.get_trading_signals(technical_indicators),
+    }
+
+
+@app.get("/", response_class=HTMLResponse)
+async def index(request: Request):
+    return templates.TemplateResponse(
+        request, "index.html", {"default_symbol": DEFAULT_SYMBOL, "llm_enabled": LLM_ENABLE})
+
+
+@app.get("/api/stock")
+async def api_stock(symbol: str = "", analysis: str = "1"):
+    symbol = symbol.strip().upper()
+    if not symbol:
+        return error_response("缺少股票代码 symbol", 400)
+    if not is_valid_symbol(symbol):
+        return error_response(f"无效的股票代码: {symbol}", 400)
+
+    if not HAS_VALID_AV_KEY:
+        return error_response("请先在 config.yaml 中配置 alpha_vantage.api_key", 500)
+
+    # 股票基本信息只有 LLM 分析会用到；需要时与行情数据并发获取
+    with_analysis = analysis != "0"
+    if with_analysis and LLM_ENABLE:
+        df, stock_info = await asyncio.gather(
+            asyncio.to_thread(fetch_intraday_data, symbol),
+            asyncio.to_thread(data_fetcher.get_stock_info, symbol),
+        )
+    else:
+        df, stock_info = await asyncio.to_thread(fetch_intraday_data, symbol), {"symbol": symbol}
+    if df is None or df.empty:
+        return error_response(f"无法获取 {symbol} 的行情数据", 500)
+
+    # 技术指标在线程池中计算，同时等待 LLM 分析
+    technical = asyncio.to_thread(stock_payload, symbol, df)
+    if with_analysis:
+        payload, analysis_text = await asyncio.gather(technical, stock_analysis_text(symbol, df, stock_info))
+    else:
+        payload, analysis_text = await technical, None
+
+    return {
+        **payload,
+        "llm_analysis": analysis_text,
+        "stock_info": stock_info,
+        "error": None,
+    }
+
+
+@app.get("/api/stock/stream")
+async def api_stock_stream(symbol: str = "", period: str = "", interval: str = ""):
+    """以 Server-Sent Events 流式返回分析文本"""
+    symbol = symbol.strip().upper()
+    if not symbol:
+        return error_response("缺少股票代码 symbol", 400)
+    if not is_valid_symbol(symbol):
+        return error_response(f"无效的股票代码: {symbol}", 400)
+
+    # 指定 period/interval 时与 /api/stock_data 分析同一份数据，否则沿用 /api/stock 的5分钟线
+    if period or interval:
+        df = await asyncio.to_thread(fetch_stock_data, symbol, period or "1mo", interval or "1d")
+    else:
+        df = await asyncio.to_thread(fetch_intraday_data, symbol)
+    if df is None or df.empty:
+        return error_response(f"无法获取 {symbol} 的行情数据", 500)
+
+    # 同步生成器由 StreamingResponse 在线程池中迭代
+    def generate():
+        if LLM_ENABLE:
+            stock_info = data_fetcher.get_stock_info(symbol)
+            for chunk in llm_analyzer.comprehensive_analysis_stream(symbol, df, stock_info, LLM_MODEL):
+                yield sse_event({"delta": chunk})
+        else:
+            yield sse_event({"delta": llm_analyzer.quick_analysis(symbol, df)})
+        yield sse_event({"done": True})
+
+    return StreamingResponse(generate(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.get("/api/stock_data_stream")
+async def api_stock_data_stream(symbol: str = DEFAULT_SYMBOL, period: str = "1mo", interval: str = "1d"):
+    """以 NDJSON 流式返回K线数据，适合长周期的分钟级数据"""
+    df = await asyncio.to_thread(fetch_stock_data, symbol, period, interval)
+    if df is None:
+        return error_response("Failed to fetch stock data", 500)
+
+    return StreamingResponse(iter_ohlcv_ndjson(df), media_type="application/x-ndjson")
+
+
+@app.get("/api/stock_data")
+async def api_stock_data(symbol: str = DEFAULT_SYMBOL, period: str = "1mo", interval: str = "1d",
+                         analysis_type: str = "quick"):
+    """增强API端点，支持更多参数和功能"""
+    try:
+        df, stock_info = await asyncio.gather(
+            asyncio.to_thread(fetch_stock_data, symbol, period, interval),
+            asyncio.to_thread(data_fetcher.get_stock_info, symbol),
+        )
+        if df is None:
+            return error_response("Failed to fetch stock data", 500)
+
+        technical_indicators = await asyncio.to_thread(technical_analyzer.calculate_all_indicators, df)
+        trading_signals = technical_analyzer.get_trading_signals(technical_indicators)
+        technical_summary = technical_analyzer.format_indicators_summary(technical_indicators)
+
+        if analysis_type == "full" and LLM_ENABLE:
+            analysis = stock_analysis_text(symbol, df, stock_info)
+        else:
+            analysis = asyncio.to_thread(select_analysis, symbol, df, stock_info,
+                                         technical_summary, analysis_type)
+        data, analysis = await asyncio.gather(asyncio.to_thread(build_ohlcv_records, df), analysis)
+
+        return {
+            "symbol": symbol,
+            "period": period,
+            "interval": interval,
+            "data": data,
+            "analysis": analysis,
+            "stock_info": stock_info,
+            "technical_indicators": {
+                "summary": technical_summary,
+                "signals": trading_signals
+            }
+        }
+
+    except Exception as e:
+        logger.error(f"API错误: {e}")
+        return error_response(f"Internal server error: {str(e)}", 500)
+
+
+@app.get("/api/bulk")
+async def api_bulk(symbols: str = "", period: str = "1mo", interval: str = "1d",
+                   analysis_type: str = "quick"):
+    """并行分析多只股票，每只股票独立获取数据和分析"""
+    symbol_list = parse_symbols(symbols)
+    if not symbol_list:
+        return error_response("缺少股票代码 symbols", 400)
+    if len(symbol_list) > MAX_BULK_SYMBOLS:
+        return error_response(f"一次最多分析 {MAX_BULK_SYMBOLS} 只股票", 400)
+
+    with_llm = analysis_type == "full" and LLM_ENABLE
+    results = await asyncio.gather(
+        *(asyncio.to_thread(analyze_symbol, symbol, period, interval, with_llm) for symbol in symbol_list))
+
+    return {"results": list(results)}
+
+
+@app.get("/api/batch")
+async def api_batch(symbols: str = "", period: str = "1mo", interval: str = "1d"):
+    """在一次LLM调用中批量分析多只股票"""
+    symbol_list = parse_symbols(symbols)
+    if not symbol_list:
+        return error_response("缺少股票代码 symbols", 400)
+    if len(symbol_list) > MAX_BATCH_SYMBOLS:
+        return error_response(f"一次最多分析 {MAX_BATCH_SYMBOLS} 只股票", 400)
+
+    try:
+        return {"results": await asyncio.to_thread(batch_results, symbol_list, period, interval)}
+
+    except Exception as e:
+        logger.error(f"批量分析API错误: {e}")
+        return error_response(f"Internal server error: {str(e)}", 500)
+
+
+@app.get("/api/cache/stats")
+async def api_cache_stats():
+    """数据缓存命中统计"""
+    return data_fetcher.cache_stats()
+
+
+@app.get("/api/market_overview")
+async def api_market_overview():
+    """市场概览API（各指数由一次批量下载获取）"""
+    try:
+        indices = await asyncio.to_thread(data_fetcher.get_market_indices)
+
+        overview = {}
+        for name, df in indices.items():
+            if df is not None and not df.empty:
+                overview[name] = build_index_overview(df)
+
+        return {"market_overview": overview}
+
+    except Exception as e:
+        logger.error(f"市场概览API错误: {e}")
+        return error_response(f"Failed to fetch market overview: {str(e)}", 500)
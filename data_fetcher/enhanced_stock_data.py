@@ -1,22 +1,129 @@
-import yfinance as yf
+import numpy as np
 import pandas as pd
-import requests
-from typing import Optional, Dict, List
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
 import logging
+from .http_session import create_session
+
+# yfinance 会连带导入大量 HTTP/HTML 解析依赖，在各获取方法中首次使用时才导入
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 磁盘缓存有效期（秒）：分钟/小时线变化快，日线及以上可以保留更久
+_INTRADAY_CACHE_TTL = 300
+_DAILY_CACHE_TTL = 3600
+
+# 内存缓存容量；行情数据沿用上面按周期区分的有效期
+_MEMORY_CACHE_SIZE = 512
+# 股票基本信息（行业、市值、beta 等）变化很慢，缓存更多条目、保留更久
+_INFO_CACHE_SIZE = 1024
+_INFO_CACHE_TTL = 6 * _DAILY_CACHE_TTL
+
+# 获取失败的 (数据源, 代码, 周期, 间隔) 短暂记住，避免无效代码反复请求上游
+_NOT_FOUND_CACHE_TTL = 60
+
+# 代码格式：字母数字及 . - ^ =，如 AAPL、BRK-B、^GSPC、000001.SS、EURUSD=X
+_SYMBOL_RE = re.compile(r'^[A-Za-z0-9.^=-]{1,12}$')
+
+# 批量获取时的并发线程数（网络I/O为主，线程等待时释放GIL）
+_FETCH_MAX_WORKERS = 16
+
+# Alpha Vantage 时间序列中每根K线的字段名，顺序对应 Open/High/Low/Close/Volume
+_AV_FIELDS = ('1. open', '2. high', '3. low', '4. close', '5. volume')
+
+# 主要市场指数：显示名称 -> 代码
+MARKET_INDICES = {
+    'S&P 500': '^GSPC',
+    'Dow Jones': '^DJI', 
+    'NASDAQ': '^IXIC',
+    'VIX': '^VIX',
+    'Shanghai Composite': '000001.SS',
+    'Hang Seng': '^HSI'
+}
+
+
+def is_valid_symbol(symbol: str) -> bool:
+    """检查代码格式，明显无效的代码无需请求数据源"""
+    return bool(_SYMBOL_RE.match(symbol))
+
+
+def _cache_ttl(interval: str) -> int:
+    """按数据间隔返回缓存有效期：分钟/小时线变化快，日线及以上可以保留更久"""
+    return _INTRADAY_CACHE_TTL if interval.endswith(('m', 'min', 'h')) else _DAILY_CACHE_TTL
+
+
+class _TTLCache:
+    """线程安全的 LRU 缓存，每个条目带过期时间，并统计命中次数"""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # 键 -> (过期时间, 值)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """读取未过期的条目，未命中时返回 None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key, value, ttl: float):
+        """写入条目，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'size': len(self._data), 'maxsize': self.maxsize,
+                    'hits': self.hits, 'misses': self.misses}
+
 
 class EnhancedStockDataFetcher:
     """增强的股票数据获取器，支持多数据源和多时间框架"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = ".cache"):
         self.data_sources = {
             'yfinance': self._fetch_yfinance_data,
             'alpha_vantage': self._fetch_alpha_vantage_data,
         }
+        # 行情数据的 Parquet 磁盘缓存目录，为 None 时不缓存
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        # Alpha Vantage 请求复用连接（keep-alive）
+        self._session = create_session()
+        # 内存缓存：重复请求不再读磁盘或访问网络
+        self._data_cache = _TTLCache(_MEMORY_CACHE_SIZE)
+        self._info_cache = _TTLCache(_INFO_CACHE_SIZE)
+        self._not_found_cache = _TTLCache(_MEMORY_CACHE_SIZE)
+        # 正在进行的请求：同一键的并发请求共享一次上游调用
+        self._inflight: Dict[tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._coalesced = 0
+        # 批量获取多只股票时共用的线程池
+        self._pool = ThreadPoolExecutor(max_workers=_FETCH_MAX_WORKERS, thread_name_prefix="fetch")
     
     def get_stock_data(self, symbol: str, period: str = "1mo", interval: str = "1d", 
                       source: str = "yfinance", **kwargs) -> Optional[pd.DataFrame]:
@@ -30,28 +137,138 @@ class EnhancedStockDataFetcher:
             source: 数据源 (yfinance, alpha_vantage)
         """
         try:
-            if source in self.data_sources:
-                return self.data_sources[source](symbol, period, interval, **kwargs)
-            else:
+            if source not in self.data_sources:
                 logger.warning(f"不支持的数据源: {source}，使用默认yfinance")
-                return self._fetch_yfinance_data(symbol, period, interval)
+                source = 'yfinance'
+                kwargs = {}
+            
+            if not is_valid_symbol(symbol):
+                logger.warning(f"无效的股票代码: {symbol}")
+                return None
+            
+            key = ('data', source, symbol, period, interval)
+            df = self._data_cache.get(key)
+            if df is not None:
+                return df
+            if self._not_found_cache.get(key):
+                return None
+            
+            return self._coalesce(key, lambda: self._load_stock_data(key, **kwargs))
         except Exception as e:
             logger.error(f"获取股票数据失败 {symbol}: {e}")
             return None
     
+    def _load_stock_data(self, key: tuple, **kwargs) -> Optional[pd.DataFrame]:
+        """依次尝试磁盘缓存和数据源，结果写入内存缓存"""
+        _, source, symbol, period, interval = key
+        cache_path = self._cache_path(symbol, period, interval, source)
+        df, ttl = self._read_cache(cache_path, interval)
+        if df is None:
+            df = self.data_sources[source](symbol, period, interval, **kwargs)
+            if df is not None and df.empty:
+                # 数据源明确没有该代码的数据，短暂记住；网络错误、限流等失败不记录
+                self._not_found_cache.put(key, True, _NOT_FOUND_CACHE_TTL)
+                return None
+            if df is not None:
+                self._write_cache(cache_path, df)
+        
+        if df is not None:
+            self._data_cache.put(key, df, ttl)
+        return df
+    
+    def _coalesce(self, key: tuple, load):
+        """同一键同时只执行一次 load，其余并发调用等待并共享其结果"""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self._coalesced += 1
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            result = load()
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+    
+    def cache_stats(self) -> Dict:
+        """内存缓存命中统计"""
+        with self._inflight_lock:
+            coalesced = self._coalesced
+        return {
+            'stock_data': self._data_cache.stats(),
+            'stock_info': self._info_cache.stats(),
+            'not_found': self._not_found_cache.stats(),
+            'coalesced_requests': coalesced,
+        }
+    
+    def _cache_path(self, symbol: str, period: str, interval: str, source: str) -> Optional[Path]:
+        """磁盘缓存文件路径"""
+        if self.cache_dir is None:
+            return None
+        name = re.sub(r'[^A-Za-z0-9.^_-]', '_', f"{source}_{symbol}_{period}_{interval}")
+        return self.cache_dir / f"{name}.parquet"
+    
+    @staticmethod
+    def _read_cache(path: Optional[Path], interval: str) -> Tuple[Optional[pd.DataFrame], float]:
+        """读取未过期的缓存数据，同时返回其剩余有效期（未命中时为完整有效期）
+        
+        磁盘数据放入内存缓存时只保留剩余有效期，避免总存活时间超过一个有效期。
+        """
+        ttl = _cache_ttl(interval)
+        if path is None:
+            return None, ttl
+        
+        try:
+            remaining = ttl - (time.time() - path.stat().st_mtime)
+        except OSError:
+            return None, ttl
+        if remaining <= 0:
+            return None, ttl
+        
+        try:
+            return pd.read_parquet(path), remaining
+        except Exception as e:
+            logger.warning(f"读取缓存失败 {path}: {e}")
+            return None, ttl
+    
+    @staticmethod
+    def _write_cache(path: Optional[Path], df: pd.DataFrame):
+        """写入缓存，缺少 Parquet 引擎（pyarrow）时跳过"""
+        if path is None or df.empty:
+            return
+        
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(path, compression='zstd')
+        except Exception as e:
+            logger.warning(f"写入缓存失败 {path}: {e}")
+    
     def _fetch_yfinance_data(self, symbol: str, period: str, interval: str, **kwargs) -> Optional[pd.DataFrame]:
-        """使用yfinance获取数据"""
+        """使用yfinance获取数据（没有该代码的数据时返回空DataFrame，请求失败时返回None）"""
         try:
+            import yfinance as yf
             ticker = yf.Ticker(symbol)
             df = ticker.history(period=period, interval=interval)
             
             if df.empty:
                 logger.warning(f"yfinance未返回数据: {symbol}")
-                return None
+                return df
             
-            # 标准化列名
-            df.columns = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
-            df = df[['Open', 'High', 'Low', 'Close', 'Volume']]  # 只保留OHLCV数据
+            # 只保留OHLCV数据：前5列固定为 Open/High/Low/Close/Volume，之后的
+            # Dividends/Stock Splits（基金还有 Capital Gains）直接切掉，不重建数据块
+            df = df.iloc[:, :5]
+            df.columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+            df = self._normalize_volume(df)
             
             logger.info(f"成功获取 {symbol} 数据，共 {len(df)} 条记录")
             return df
@@ -60,8 +277,18 @@ class EnhancedStockDataFetcher:
             logger.error(f"yfinance获取数据失败 {symbol}: {e}")
             return None
     
+    @staticmethod
+    def _normalize_volume(df: pd.DataFrame) -> pd.DataFrame:
+        """成交量统一为 int64（缺失按0计），保证缓存中的数据与获取途径无关"""
+        if df['Volume'].dtype != np.int64:
+            df = df.assign(Volume=df['Volume'].fillna(0).astype(np.int64))
+        return df
+    
     def _fetch_alpha_vantage_data(self, symbol: str, period: str, interval: str, **kwargs) -> Optional[pd.DataFrame]:
-        """使用Alpha Vantage获取数据（保持向后兼容）"""
+        """使用Alpha Vantage获取数据（保持向后兼容）
+        
+        代码无效时返回空DataFrame；请求失败或被限流（Note/Information）时返回None。
+        """
         api_key = kwargs.get('api_key')
         base_url = kwargs.get('base_url', 'https://www.alphavantage.co/query')
         
@@ -83,27 +310,23 @@ class EnhancedStockDataFetcher:
         }
         
         try:
-            resp = requests.get(base_url, params=params, timeout=15)
+            resp = self._session.get(base_url, params=params, timeout=15)
             if resp.status_code != 200:
                 logger.error(f"Alpha Vantage HTTP错误: {resp.status_code}")
                 return None
             
-            data = resp.json()
+            data = orjson.loads(resp.content) if orjson is not None else resp.json()
             key = f"Time Series ({av_interval})"
             
+            if "Error Message" in data:
+                logger.warning(f"Alpha Vantage无此代码的数据 {symbol}: {data['Error Message']}")
+                return pd.DataFrame()
+            
             if key not in data:
                 logger.warning(f"Alpha Vantage返回数据异常: {data}")
                 return None
             
-            ts = data[key]
-            df = pd.DataFrame.from_dict(ts, orient="index")
-            df.columns = ["Open", "High", "Low", "Close", "Volume"]
-            df.index = pd.to_datetime(df.index)
-            
-            for col in ["Open", "High", "Low", "Close", "Volume"]:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-            
-            df = df.sort_index()
+            df = self._parse_alpha_vantage_series(data[key])
             logger.info(f"成功获取 {symbol} Alpha Vantage数据，共 {len(df)} 条记录")
             return df
             
@@ -111,9 +334,46 @@ class EnhancedStockDataFetcher:
             logger.error(f"Alpha Vantage获取数据失败 {symbol}: {e}")
             return None
     
+    @staticmethod
+    def _parse_alpha_vantage_series(ts: Dict) -> pd.DataFrame:
+        """把 {时间: {字段: 字符串}} 形式的时间序列按列解析为按时间升序的 OHLCV DataFrame"""
+        # Alpha Vantage 按时间倒序返回，反转即为升序，无需排序
+        items = list(ts.items())
+        items.reverse()
+        times = np.array([t for t, _ in items], dtype='datetime64[s]')
+        values = np.array([[bar[field] for field in _AV_FIELDS] for _, bar in items], dtype=np.float64)
+        
+        # 顺序不符合预期时才排序
+        if (times[1:] < times[:-1]).any():
+            order = np.argsort(times, kind='stable')
+            times, values = times[order], values[order]
+        
+        return pd.DataFrame(values, index=pd.DatetimeIndex(times),
+                            columns=["Open", "High", "Low", "Close", "Volume"])
+    
     def get_stock_info(self, symbol: str) -> Dict:
-        """获取股票基本信息"""
+        """获取股票基本信息（带内存缓存，获取失败的结果不缓存）"""
+        if not is_valid_symbol(symbol):
+            return {'symbol': symbol, 'error': f"无效的股票代码: {symbol}"}
+        
+        key = ('info', symbol)
+        stock_info = self._info_cache.get(key)
+        if stock_info is not None:
+            return stock_info
+        
+        return self._coalesce(key, lambda: self._load_stock_info(key))
+    
+    def _load_stock_info(self, key: tuple) -> Dict:
+        """获取股票基本信息并写入内存缓存"""
+        stock_info = self._fetch_stock_info(key[1])
+        if 'error' not in stock_info:
+            self._info_cache.put(key, stock_info, _INFO_CACHE_TTL)
+        return stock_info
+    
+    def _fetch_stock_info(self, symbol: str) -> Dict:
+        """从yfinance获取股票基本信息"""
         try:
+            import yfinance as yf
             ticker = yf.Ticker(symbol)
             info = ticker.info
             
@@ -140,11 +400,11 @@ class EnhancedStockDataFetcher:
     
     def get_multiple_stocks(self, symbols: List[str], period: str = "1mo", 
                            interval: str = "1d") -> Dict[str, pd.DataFrame]:
-        """批量获取多只股票数据"""
+        """批量获取多只股票数据（在线程池中并发获取，结果保持输入顺序）"""
         results = {}
+        frames = self._pool.map(lambda symbol: self.get_stock_data(symbol, period, interval), symbols)
         
-        for symbol in symbols:
-            df = self.get_stock_data(symbol, period, interval)
+        for symbol, df in zip(symbols, frames):
             if df is not None:
                 results[symbol] = df
             else:
@@ -153,22 +413,62 @@ class EnhancedStockDataFetcher:
         return results
     
     def get_market_indices(self) -> Dict[str, pd.DataFrame]:
-        """获取主要市场指数数据"""
-        indices = {
-            'S&P 500': '^GSPC',
-            'Dow Jones': '^DJI', 
-            'NASDAQ': '^IXIC',
-            'VIX': '^VIX',
-            'Shanghai Composite': '000001.SS',
-            'Hang Seng': '^HSI'
-        }
+        """获取主要市场指数数据，未缓存的指数通过一次批量下载获取"""
+        period, interval = "1mo", "1d"
+        frames = {}
+        missing = []
+        for symbol in MARKET_INDICES.values():
+            key = ('data', 'yfinance', symbol, period, interval)
+            df = self._data_cache.get(key)
+            if df is None:
+                df, ttl = self._read_cache(self._cache_path(symbol, period, interval, 'yfinance'), interval)
+                if df is not None:
+                    self._data_cache.put(key, df, ttl)
+            if df is None:
+                missing.append(symbol)
+            else:
+                frames[symbol] = df
+        
+        if missing:
+            for symbol, df in self._download_yfinance_batch(missing, period, interval).items():
+                self._write_cache(self._cache_path(symbol, period, interval, 'yfinance'), df)
+                self._data_cache.put(('data', 'yfinance', symbol, period, interval), df, _cache_ttl(interval))
+                frames[symbol] = df
         
         results = {}
-        for name, symbol in indices.items():
-            df = self.get_stock_data(symbol, period="1mo", interval="1d")
-            if df is not None:
-                results[name] = df
+        for name, symbol in MARKET_INDICES.items():
+            if symbol in frames:
+                results[name] = frames[symbol]
+            else:
+                logger.warning(f"跳过无数据的指数: {name}")
+        
+        return results
+    
+    def _download_yfinance_batch(self, symbols: List[str], period: str, interval: str) -> Dict[str, pd.DataFrame]:
+        """一次请求下载多个代码的数据，返回 代码 -> OHLCV DataFrame"""
+        try:
+            import yfinance as yf
+            data = yf.download(tickers=' '.join(symbols), period=period, interval=interval,
+                               group_by='ticker', auto_adjust=True, threads=True, progress=False)
+        except Exception as e:
+            logger.error(f"yfinance批量获取数据失败 {symbols}: {e}")
+            return {}
+        
+        results = {}
+        if data is None or data.empty:
+            return results
+        
+        tickers = set(data.columns.get_level_values(0))
+        for symbol in symbols:
+            if symbol not in tickers:
+                continue
+            # 不同市场的交易日不同，批量结果按日期对齐，需去掉该代码价格缺失的行
+            df = data[symbol][['Open', 'High', 'Low', 'Close', 'Volume']].dropna(
+                subset=['Open', 'High', 'Low', 'Close'])
+            if not df.empty:
+                results[symbol] = self._normalize_volume(df)
         
+        logger.info(f"批量获取 {len(results)}/{len(symbols)} 个代码的数据")
         return results
 
 
@@ -0,0 +1,25 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_session(pool_connections: int = 16, pool_maxsize: int = 32, **retry_kwargs) -> requests.Session:
+    """创建带连接池和自动重试的 requests.Session，复用 TCP/TLS 连接
+
+    限流（429）和服务端错误（5xx）也会退避重试；重试用尽后返回最后一次响应，
+    由调用方按状态码处理。
+    """
+    retry_kwargs.setdefault('total', 3)
+    retry_kwargs.setdefault('backoff_factor', 0.3)
+    retry_kwargs.setdefault('status_forcelist', (429, 500, 502, 503, 504))
+    retry_kwargs.setdefault('raise_on_status', False)
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(**retry_kwargs),
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
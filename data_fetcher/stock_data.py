@@ -1,8 +1,13 @@
 import requests
 import pandas as pd
+from .http_session import create_session
 
+# 模块级共享会话，避免每次请求重新握手
+_http = create_session()
 
-def get_stock_data(symbol: str, api_key: str, base_url: str = "https://www.alphavantage.co/query"):
+
+def get_stock_data(symbol: str, api_key: str, base_url: str = "https://www.alphavantage.co/query",
+                   session: requests.Session = None):
     params = {
         "function": "TIME_SERIES_INTRADAY",
         "symbol": symbol,
@@ -11,7 +16,7 @@ def get_stock_data(symbol: str, api_key: str, base_url: str = "https://www.alpha
     }
 
     try:
-        resp = requests.get(base_url, params=params, timeout=15)
+        resp = (session or _http).get(base_url, params=params, timeout=15)
     except Exception as e:
         print(f"❌ [{symbol}] 请求异常: {e}")
         return None
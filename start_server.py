@@ -9,12 +9,15 @@ import subprocess
 import argparse
 import signal
 import time
+import importlib.util
+
+SERVERS = ('auto', 'uvicorn', 'gunicorn', 'flask')
 
 def check_dependencies():
     """检查依赖是否安装"""
     required_packages = [
         'flask', 'yfinance', 'pandas', 'numpy', 
-        'ta', 'requests', 'pyyaml'
+        'requests', 'pyyaml'
     ]
     
     missing_packages = []
@@ -41,11 +44,47 @@ def check_config():
     print("✅ 配置文件存在")
     return True
 
-def start_server(host="0.0.0.0", port=12000, debug=False):
+def has_module(name):
+    """检查模块是否可导入（不实际导入）"""
+    return importlib.util.find_spec(name) is not None
+
+def build_command(host, port, debug, server, workers):
+    """构建启动命令
+    
+    auto 模式下优先使用多进程的 uvicorn（异步版本 app_async），其次 gunicorn（多线程 worker），
+    都未安装或开启调试模式时使用 Flask 开发服务器（单进程，仅适合开发调试）。
+    """
+    if server == 'auto':
+        if debug:
+            server = 'flask'
+        elif has_module('uvicorn'):
+            server = 'uvicorn'
+        elif has_module('gunicorn'):
+            server = 'gunicorn'
+        else:
+            server = 'flask'
+    
+    if server == 'uvicorn':
+        cmd = [sys.executable, '-m', 'uvicorn', 'app_async:app',
+               '--host', host, '--port', str(port), '--workers', str(workers)]
+        if has_module('uvloop'):
+            cmd += ['--loop', 'uvloop']
+    elif server == 'gunicorn':
+        cmd = [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-k', 'gthread', '--threads', '8',
+               '-b', f'{host}:{port}', 'app:app']
+    else:
+        cmd = [sys.executable, 'app.py', '--host', host, '--port', str(port),
+               '--debug' if debug else '--no-debug']
+    return server, cmd
+
+def start_server(host="0.0.0.0", port=12000, debug=False, server='auto', workers=None):
     """启动服务器"""
+    server, cmd = build_command(host, port, debug, server, workers or os.cpu_count() or 1)
+    
     print("🚀 启动智能理财炒股 Agent...")
     print(f"📍 服务地址: http://{host}:{port}")
     print(f"🔧 调试模式: {'开启' if debug else '关闭'}")
+    print(f"🖥️  服务器: {server}")
     print("📊 功能特性:")
     print("   • 多数据源股票数据获取")
     print("   • 专业技术指标分析")
@@ -56,11 +95,6 @@ def start_server(host="0.0.0.0", port=12000, debug=False):
     print("⚠️  投资有风险，决策需谨慎！")
     print("=" * 50)
     
-    # 构建启动命令
-    cmd = [sys.executable, 'app.py', '--host', host, '--port', str(port)]
-    if not debug:
-        cmd.append('--no-debug')
-    
     try:
         # 启动服务器
         process = subprocess.Popen(cmd)
@@ -84,7 +118,10 @@ def main():
     parser = argparse.ArgumentParser(description='智能理财炒股 Agent 启动器')
     parser.add_argument('--host', default='0.0.0.0', help='服务器地址 (默认: 0.0.0.0)')
     parser.add_argument('--port', type=int, default=12000, help='端口号 (默认: 12000)')
-    parser.add_argument('--debug', action='store_true', help='启用调试模式')
+    parser.add_argument('--debug', action='store_true', help='启用调试模式（使用 Flask 开发服务器）')
+    parser.add_argument('--server', choices=SERVERS, default='auto',
+                        help='服务器类型 (默认: auto，依次尝试 uvicorn、gunicorn、flask)')
+    parser.add_argument('--workers', type=int, default=None, help='工作进程数 (默认: CPU 核数)')
     parser.add_argument('--check-only', action='store_true', help='仅检查环境，不启动服务器')
     
     args = parser.parse_args()
@@ -104,7 +141,7 @@ def main():
         return
     
     # 启动服务器
-    start_server(args.host, args.port, args.debug)
+    start_server(args.host, args.port, args.debug, args.server, args.workers)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
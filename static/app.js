@@ -1,4 +1,5 @@
 let chart = null;
+let analysisSource = null;
 
 async function fetchStock(symbol) {
   const statusEl = document.getElementById('status');
@@ -10,7 +11,7 @@ async function fetchStock(symbol) {
   analysisBox.textContent = '加载中...';
 
   try {
-    const resp = await fetch(`/api/stock?symbol=${encodeURIComponent(symbol)}`);
+    const resp = await fetch(`/api/stock?symbol=${encodeURIComponent(symbol)}&analysis=0`);
     const data = await resp.json();
 
     if (!resp.ok || data.error) {
@@ -39,11 +40,7 @@ async function fetchStock(symbol) {
     const closes = data.points.map(p => p.close);
     renderChart(labels, closes, s.symbol);
 
-    if (data.llm_analysis) {
-      analysisBox.textContent = data.llm_analysis;
-    } else {
-      analysisBox.textContent = '未启用 LLM 分析或调用失败。可以在 config.yaml 中开启 llm.enable。';
-    }
+    streamAnalysis(symbol, analysisBox);
 
   } catch (err) {
     statusEl.textContent = `❌ 请求异常：${err}`;
@@ -52,6 +49,37 @@ async function fetchStock(symbol) {
   }
 }
 
+function streamAnalysis(symbol, analysisBox) {
+  if (analysisSource) {
+    analysisSource.close();
+  }
+
+  let text = '';
+  analysisSource = new EventSource(`/api/stock/stream?symbol=${encodeURIComponent(symbol)}`);
+
+  analysisSource.onmessage = (e) => {
+    const msg = JSON.parse(e.data);
+    if (msg.done) {
+      analysisSource.close();
+      analysisSource = null;
+      if (!text) {
+        analysisBox.textContent = '未启用 LLM 分析或调用失败。可以在 config.yaml 中开启 llm.enable。';
+      }
+      return;
+    }
+    text += msg.delta;
+    analysisBox.textContent = text;
+  };
+
+  analysisSource.onerror = () => {
+    analysisSource.close();
+    analysisSource = null;
+    if (!text) {
+      analysisBox.textContent = '未启用 LLM 分析或调用失败。可以在 config.yaml 中开启 llm.enable。';
+    }
+  };
+}
+
 function renderChart(labels, data, symbol) {
   const ctx = document.getElementById('priceChart').getContext('2d');
   if (chart) {
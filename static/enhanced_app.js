@@ -2,6 +2,7 @@
 let priceChart = null;
 let indicatorChart = null;
 let currentIndicator = 'rsi';
+let analysisSource = null;
 
 // 页面加载完成后初始化
 document.addEventListener('DOMContentLoaded', () => {
@@ -102,12 +103,20 @@ async function fetchStockData(symbol, period, interval, analysisType) {
   tradingSignals.innerHTML = '<div class="loading">生成交易信号中...</div>';
   analysisBox.innerHTML = '<div class="loading">AI分析中...</div>';
   
+  // 完整AI分析通过 SSE 逐段显示，行情和指标请求不必等待 LLM 生成完毕
+  const streamFull = analysisType === 'full';
+  if (streamFull) {
+    streamAnalysis(symbol, period, interval);
+  } else {
+    closeAnalysisStream();
+  }
+  
   try {
     const params = new URLSearchParams({
       symbol: symbol,
       period: period,
       interval: interval,
-      analysis_type: analysisType
+      analysis_type: streamFull ? 'technical' : analysisType
     });
     
     const response = await fetch(`/api/stock_data?${params}`);
@@ -122,6 +131,7 @@ async function fetchStockData(symbol, period, interval, analysisType) {
       technicalSummary.innerHTML = '<div class="loading">技术分析失败</div>';
       tradingSignals.innerHTML = '<div class="loading">信号生成失败</div>';
       analysisBox.innerHTML = '<div class="loading">AI分析失败</div>';
+      closeAnalysisStream();
       return;
     }
     
@@ -136,7 +146,9 @@ async function fetchStockData(symbol, period, interval, analysisType) {
     updateStockInfo(data.stock_info);
     updateTechnicalSummary(data.technical_indicators.summary);
     updateTradingSignals(data.technical_indicators.signals);
-    updateAnalysis(data.analysis);
+    if (!streamFull) {
+      updateAnalysis(data.analysis);
+    }
     
     // 渲染图表
     renderPriceChart(data);
@@ -263,6 +275,51 @@ function updateTradingSignals(signals) {
   tradingSignals.innerHTML = html;
 }
 
+function closeAnalysisStream() {
+  if (analysisSource) {
+    analysisSource.close();
+    analysisSource = null;
+  }
+}
+
+function streamAnalysis(symbol, period, interval) {
+  closeAnalysisStream();
+  
+  const analysisBox = document.getElementById('analysisBox');
+  const params = new URLSearchParams({ symbol: symbol, period: period, interval: interval });
+  const source = new EventSource(`/api/stock/stream?${params}`);
+  analysisSource = source;
+  
+  let text = '';
+  let pre = null;
+  
+  source.onmessage = (e) => {
+    const msg = JSON.parse(e.data);
+    if (msg.done) {
+      closeAnalysisStream();
+      if (!text) {
+        updateAnalysis('');
+      }
+      return;
+    }
+    if (!pre) {
+      pre = document.createElement('pre');
+      analysisBox.replaceChildren(pre);
+    }
+    text += msg.delta;
+    pre.textContent = text;
+  };
+  
+  source.onerror = () => {
+    // 只处理当前请求的流，避免旧连接覆盖新查询的结果
+    if (source !== analysisSource) return;
+    closeAnalysisStream();
+    if (!text) {
+      analysisBox.innerHTML = '<div class="loading">AI分析失败</div>';
+    }
+  };
+}
+
 function updateAnalysis(analysis) {
   const analysisBox = document.getElementById('analysisBox');
   analysisBox.innerHTML = `<pre>${analysis || '暂无分析数据'}</pre>`;